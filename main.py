@@ -7,7 +7,7 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.api.server import api_server
+from src.api.server import run
 from src.utils.logger import setup_logger
 
 logger = setup_logger('main')
@@ -16,7 +16,7 @@ def main():
     """Main function to start the emulator"""
     try:
         logger.info("Starting BingX Emulator...")
-        api_server.run()
+        run()
     except KeyboardInterrupt:
         logger.info("Shutting down BingX Emulator...")
     except Exception as e:
@@ -1,10 +1,17 @@
 """
 FastAPI server for BingX Emulator
 """
-from fastapi import FastAPI, HTTPException, Query, Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Body, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from typing import Optional, List, Dict, Any
 from datetime import timedelta
+from contextlib import asynccontextmanager
+import asyncio
+import heapq
+import itertools
+import numpy as np
+import orjson
 import uvicorn
 import atexit
 
@@ -12,22 +19,53 @@ from src.data.manager import DataManager
 from src.time.manager import TimeManager
 from src.trading.balance_manager import BalanceManager
 from src.trading.order_engine import OrderEngine
-from src.trading.models import OrderStatus
+from src.trading.models import OrderStatus, PositionSide
+from src.trading._kernels import scan_tp_sl, TRIGGER_TP, TRIGGER_SL
 from src.state.manager import StateManager
-from src.utils.trade_logger import TradeLogger
+from src.utils.trade_logger import get_trade_logger
 from src.utils.logger import setup_logger
 from src.config.settings import settings
 
 logger = setup_logger(__name__)
 
+# "data" of 500 responses for routes whose clients expect a list or object
+# there; other routes send null
+ERROR_DATA_BY_PATH = {
+    "/openApi/swap/v3/quote/klines": [],
+    "/openApi/swap/v2/trade/openOrders": [],
+    "/openApi/swap/v2/trade/allOrders": [],
+    "/openApi/swap/v2/user/positions": [],
+    "/api/v1/klines/batch": {"results": []},
+    "/api/v1/trading/summary": {},
+    "/api/v1/symbols": {"symbols": [], "count": 0},
+}
+
+# Mock orderbook response; symbol, bid/ask prices and timestamp are patched in per request
+DEPTH_PRICE_MULTIPLIERS = (0.999, 0.998, 0.997, 1.001, 1.002, 1.003)
+DEPTH_RESPONSE_TEMPLATE = (
+    b'{"code":0,"msg":"success","data":{"symbol":"%s",'
+    b'"bids":[["%s","1000"],["%s","2000"],["%s","3000"]],'
+    b'"asks":[["%s","1000"],["%s","2000"],["%s","3000"]],'
+    b'"timestamp":%d}}'
+)
+
 class BingXEmulatorAPI:
     """
     BingX API emulator server
     """
 
     def __init__(self):
-        self.app = FastAPI(title="BingX Emulator", version="1.0.0")
+        self.app = FastAPI(
+            title="BingX Emulator", version="1.0.0",
+            default_response_class=ORJSONResponse, lifespan=self._lifespan
+        )
+        if settings.API_GZIP_MIN_SIZE:
+            # Large klines payloads are repetitive JSON; worth it off localhost
+            self.app.add_middleware(GZipMiddleware, minimum_size=settings.API_GZIP_MIN_SIZE)
         self.data_manager = DataManager()
+        self._symbol_arrays: Dict[str, tuple] = {}  # symbol -> (ts_ns, high, low, close)
+        # New symbols are only discovered on restart, so validate against a snapshot
+        self._available_symbols = frozenset(self.data_manager.get_available_symbols())
 
         # Initialize time manager with earliest available time
         earliest_time = self.data_manager.get_earliest_time("ADA-USDT")
@@ -43,10 +81,15 @@ class BingXEmulatorAPI:
         self.balance_manager = BalanceManager()
         self.order_engine = OrderEngine(self.balance_manager)
         self.state_manager = StateManager()
-        self.trade_logger = TradeLogger()
+        self.trade_logger = get_trade_logger()
 
         # Load saved state
         self.state_manager.load_all_state(self.balance_manager, self.order_engine, self.time_manager)
+        self.balance_manager.on_change = self.state_manager.mark_dirty
+        self.order_engine.on_change = self.state_manager.mark_dirty
+
+        # Set by request handlers, picked up by the background state writer
+        self._state_dirty = asyncio.Event()
 
         # Register cleanup on exit
         atexit.register(self._cleanup)
@@ -54,19 +97,56 @@ class BingXEmulatorAPI:
         # Setup routes
         self._setup_routes()
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Run the background state writer while the server is up, flush trade logs on shutdown"""
+        writer = asyncio.create_task(self._state_writer())
+        yield
+        writer.cancel()
+        self.trade_logger.flush()
+
+    async def _state_writer(self):
+        """Save state off the request path, coalescing bursts of changes"""
+        while True:
+            await self._state_dirty.wait()
+            await asyncio.sleep(settings.STATE_SAVE_DEBOUNCE)
+            self._state_dirty.clear()
+            self.state_manager.save_all_state(
+                self.balance_manager, self.order_engine, self.time_manager
+            )
+
     def _cleanup(self):
         """Save state on exit"""
         try:
-            self.state_manager.save_all_state(self.balance_manager, self.order_engine, self.time_manager)
+            self.state_manager.save_all_state(
+                self.balance_manager, self.order_engine, self.time_manager, wait=True
+            )
             logger.info("State saved on exit")
         except Exception as e:
             logger.error(f"Error saving state on exit: {e}")
+        self.trade_logger.close()
 
     def _setup_routes(self):
         """Setup API routes"""
+        # Endpoints reading only candle data are plain defs so FastAPI runs
+        # them in its threadpool. Everything touching trading state, readers
+        # included, stays async so it remains serialized on the event loop.
+
+        @self.app.exception_handler(Exception)
+        async def handle_internal_error(request: Request, exc: Exception):
+            """Return BingX-style error for unhandled exceptions"""
+            logger.error("Error in %s endpoint: %s", request.url.path, exc)
+            return ORJSONResponse(
+                status_code=500,
+                content={
+                    "code": 500,
+                    "msg": f"Internal error: {str(exc)}",
+                    "data": ERROR_DATA_BY_PATH.get(request.url.path)
+                }
+            )
 
         @self.app.get("/openApi/swap/v3/quote/klines")
-        async def get_klines(
+        def get_klines(
             symbol: str = Query(..., description="Trading pair symbol"),
             interval: str = Query("5m", description="Timeframe interval"),
             limit: int = Query(500, description="Number of candles"),
@@ -74,112 +154,81 @@ class BingXEmulatorAPI:
             endTime: Optional[int] = Query(None, description="End time in milliseconds")
         ):
             """Get klines data in BingX format"""
-            try:
-                logger.info(f"Klines request: {symbol}, {interval}, limit={limit}")
+            logger.info("Klines request: %s, %s, limit=%d", symbol, interval, limit)
 
-                # Validate symbol
-                if not self.data_manager.validate_symbol(symbol):
-                    return JSONResponse(
-                        status_code=404,
-                        content={
-                            "code": 404,
-                            "msg": f"Symbol {symbol} not found or no data available",
-                            "data": []
-                        }
-                    )
+            result = self._get_klines_result(symbol, interval, limit)
+            if result["code"] != 0:
+                return ORJSONResponse(status_code=404, content=result)
+            return result
 
-                klines = self.data_manager.get_klines(
-                    symbol=symbol,
-                    interval=interval,
-                    limit=limit,
-                    current_time=self.time_manager.current_time
-                )
+        @self.app.post("/api/v1/klines/batch")
+        def get_klines_batch(
+            queries: List[Dict[str, Any]] = Body(..., embed=True,
+                                                 description="Klines queries: symbol, interval, limit")
+        ):
+            """Get klines for several symbols in one request"""
+            logger.info("Klines batch request: %d queries", len(queries))
 
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": klines
-                }
+            results = []
+            for query in queries:
+                symbol = query.get("symbol", "")
+                result = self._get_klines_result(symbol, query.get("interval", "5m"),
+                                                 int(query.get("limit", 500)))
+                results.append({"symbol": symbol, **result})
 
-            except Exception as e:
-                logger.error(f"Error in klines endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": []
-                    }
-                )
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": {
+                    "results": results
+                }
+            }
 
         @self.app.get("/openApi/swap/v2/quote/depth")
-        async def get_depth(
+        def get_depth(
             symbol: str = Query(..., description="Trading pair symbol"),
             limit: int = Query(50, description="Depth limit")
         ):
             """Get orderbook depth (mocked)"""
-            try:
-                logger.info(f"Depth request: {symbol}, limit={limit}")
+            logger.info("Depth request: %s, limit=%d", symbol, limit)
 
-                # Validate symbol
-                if not self.data_manager.validate_symbol(symbol):
-                    return JSONResponse(
-                        status_code=404,
-                        content={
-                            "code": 404,
-                            "msg": f"Symbol {symbol} not found or no data available",
-                            "data": None
-                        }
-                    )
-
-                # Mock depth data
-                current_price = self.data_manager.get_current_price(
-                    symbol, self.time_manager.current_time
+            # Validate symbol
+            if symbol not in self._available_symbols:
+                return ORJSONResponse(
+                    status_code=404,
+                    content={
+                        "code": 404,
+                        "msg": f"Symbol {symbol} not found or no data available",
+                        "data": None
+                    }
                 )
 
-                if current_price is None:
-                    return JSONResponse(
-                        status_code=404,
-                        content={
-                            "code": 404,
-                            "msg": "Symbol not found",
-                            "data": None
-                        }
-                    )
+            # Mock depth data
+            current_price = self.data_manager.get_current_price(
+                symbol, self.time_manager.current_time
+            )
 
-                # Create mock orderbook
-                depth_data = {
-                    "symbol": symbol,
-                    "bids": [
-                        [str(current_price * 0.999), "1000"],
-                        [str(current_price * 0.998), "2000"],
-                        [str(current_price * 0.997), "3000"]
-                    ],
-                    "asks": [
-                        [str(current_price * 1.001), "1000"],
-                        [str(current_price * 1.002), "2000"],
-                        [str(current_price * 1.003), "3000"]
-                    ],
-                    "timestamp": self.time_manager.get_timestamp_ms()
-                }
-
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": depth_data
-                }
-
-            except Exception as e:
-                logger.error(f"Error in depth endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
+            if current_price is None:
+                return ORJSONResponse(
+                    status_code=404,
                     content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
+                        "code": 404,
+                        "msg": "Symbol not found",
                         "data": None
                     }
                 )
 
+            # Create mock orderbook
+            body = DEPTH_RESPONSE_TEMPLATE % (
+                symbol.encode(),
+                # Shortest round-trip digits like str(), but never in exponent form
+                *[np.format_float_positional(current_price * m, trim='0').encode()
+                  for m in DEPTH_PRICE_MULTIPLIERS],
+                self.time_manager.get_timestamp_ms()
+            )
+
+            return Response(content=body, media_type="application/json")
+
         @self.app.post("/openApi/swap/v2/trade/order")
         async def create_order(
             symbol: str = Body(..., embed=True),
@@ -193,11 +242,11 @@ class BingXEmulatorAPI:
         ):
             """Create a new order"""
             try:
-                logger.info(f"Order request: {symbol} {side} {quantity}")
+                logger.info("Order request: %s %s %s", symbol, side, quantity)
 
                 # Validate symbol
-                if not self.data_manager.validate_symbol(symbol):
-                    return JSONResponse(
+                if symbol not in self._available_symbols:
+                    return ORJSONResponse(
                         status_code=404,
                         content={
                             "code": 404,
@@ -211,13 +260,11 @@ class BingXEmulatorAPI:
                 stop_loss = None
 
                 if takeProfit:
-                    import json
-                    tp_data = json.loads(takeProfit)
+                    tp_data = orjson.loads(takeProfit)
                     take_profit = float(tp_data.get('stopPrice', 0))
 
                 if stopLoss:
-                    import json
-                    sl_data = json.loads(stopLoss)
+                    sl_data = orjson.loads(stopLoss)
                     stop_loss = float(sl_data.get('stopPrice', 0))
 
                 # Create order
@@ -234,7 +281,7 @@ class BingXEmulatorAPI:
                     self.trade_logger.log_error("order_creation_failed", message, {
                         "symbol": symbol, "side": side, "quantity": quantity
                     })
-                    return JSONResponse(
+                    return ORJSONResponse(
                         status_code=400,
                         content={
                             "code": 400,
@@ -249,32 +296,23 @@ class BingXEmulatorAPI:
                                 # Execute market order immediately
                 execution_result = None
                 if type == "MARKET":
-                    current_price = self.data_manager.get_current_price(
-                        symbol, self.time_manager.current_time
-                    )
-
-                    if current_price:
-                        # Get current candle data for TP/SL checking
-                        base_df = self.data_manager.load_symbol_data(symbol)
-                        filtered_df = base_df[base_df.index <= self.time_manager.current_time]
-
-                        if not filtered_df.empty:
-                            current_candle = filtered_df.iloc[-1]
-                            success = self.order_engine.execute_market_order(
-                                order, current_price,
-                                current_candle['high'], current_candle['low']
+                    # Current candle close is the market price; high/low are used for TP/SL checking
+                    current_bar = self._get_current_bar(symbol, self.time_manager.current_time)
+
+                    if current_bar is not None:
+                        current_price, high, low = current_bar
+                        success = self.order_engine.execute_market_order(
+                            order, current_price, high, low
+                        )
+
+                        if success:
+                            # Log execution
+                            self.trade_logger.log_order_executed(
+                                order, current_price, self.time_manager.current_time
                             )
 
-                            if success:
-                                # Log execution
-                                self.trade_logger.log_order_executed(
-                                    order, current_price, self.time_manager.current_time
-                                )
-
-                                # Save state after successful execution
-                                self.state_manager.save_all_state(
-                                    self.balance_manager, self.order_engine, self.time_manager
-                                )
+                            # Schedule state save after successful execution
+                            self._state_dirty.set()
 
                 # Handle immediate execution with TP/SL simulation
                 if immediate and order.status == OrderStatus.FILLED:
@@ -298,7 +336,7 @@ class BingXEmulatorAPI:
                 self.trade_logger.log_error("order_endpoint_error", str(e), {
                     "symbol": symbol, "side": side, "quantity": quantity
                 })
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=500,
                     content={
                         "code": 500,
@@ -310,159 +348,96 @@ class BingXEmulatorAPI:
         @self.app.get("/openApi/swap/v2/trade/openOrders")
         async def get_open_orders():
             """Get open orders"""
-            try:
-                open_orders = self.order_engine.get_open_orders()
-                orders_data = [order.to_dict() for order in open_orders]
+            orders_data = self.order_engine.get_open_orders_data()
 
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": orders_data
-                }
-
-            except Exception as e:
-                logger.error(f"Error in open orders endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": []
-                    }
-                )
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": orders_data
+            }
 
         @self.app.get("/openApi/swap/v2/trade/order")
         async def get_order_details(
             orderId: str = Query(..., description="Order ID")
         ):
             """Get order details by ID"""
-            try:
-                order = self.order_engine.get_order(orderId)
-
-                if not order:
-                    return JSONResponse(
-                        status_code=404,
-                        content={
-                            "code": 404,
-                            "msg": "Order not found",
-                            "data": None
-                        }
-                    )
-
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": order.to_dict()
-                }
+            order = self.order_engine.get_order(orderId)
 
-            except Exception as e:
-                logger.error(f"Error in order details endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
+            if not order:
+                return ORJSONResponse(
+                    status_code=404,
                     content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
+                        "code": 404,
+                        "msg": "Order not found",
                         "data": None
                     }
                 )
 
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": order.to_dict()
+            }
+
         @self.app.get("/openApi/swap/v2/trade/allOrders")
         async def get_all_orders(
             symbol: Optional[str] = Query(None, description="Trading pair symbol"),
             limit: int = Query(100, description="Number of orders to return")
         ):
             """Get all orders (open + history)"""
-            try:
-                # Get open orders
-                open_orders = self.order_engine.get_open_orders(symbol)
+            # Get open orders
+            open_orders = self.order_engine.get_open_orders(symbol)
 
-                # Get order history
-                history_orders = self.order_engine.get_order_history(symbol, limit)
+            # Get order history
+            history_orders = self.order_engine.get_order_history(symbol, limit)
 
-                # Combine and sort by creation time
-                all_orders = open_orders + history_orders
-                all_orders.sort(key=lambda x: x.created_time, reverse=True)
+            # Newest orders by creation time, limited without sorting everything
+            all_orders = heapq.nlargest(
+                limit, itertools.chain(open_orders, history_orders),
+                key=lambda x: x.created_ms
+            )
 
-                # Limit results
-                all_orders = all_orders[:limit]
+            orders_data = [order.to_dict() for order in all_orders]
 
-                orders_data = [order.to_dict() for order in all_orders]
-
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": orders_data
-                }
-
-            except Exception as e:
-                logger.error(f"Error in all orders endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": []
-                    }
-                )
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": orders_data
+            }
 
         @self.app.delete("/openApi/swap/v2/trade/order")
         async def cancel_order(
             orderId: str = Query(..., description="Order ID to cancel")
         ):
             """Cancel an order"""
-            try:
-                success, message = self.order_engine.cancel_order(orderId)
+            success, message = self.order_engine.cancel_order(orderId)
 
-                if not success:
-                    return JSONResponse(
-                        status_code=400,
-                        content={
-                            "code": 400,
-                            "msg": message,
-                            "data": None
-                        }
-                    )
-
-                return {
-                    "code": 0,
-                    "msg": "Order cancelled successfully",
-                    "data": None
-                }
-
-            except Exception as e:
-                logger.error(f"Error in cancel order endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
+            if not success:
+                return ORJSONResponse(
+                    status_code=400,
                     content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
+                        "code": 400,
+                        "msg": message,
                         "data": None
                     }
                 )
 
+            return {
+                "code": 0,
+                "msg": "Order cancelled successfully",
+                "data": None
+            }
+
         @self.app.get("/openApi/swap/v2/user/positions")
         async def get_positions():
             """Get open positions"""
-            try:
-                positions = self.balance_manager.get_all_positions()
-                positions_data = [pos.to_dict() for pos in positions]
-
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": positions_data
-                }
+            positions_data = self.balance_manager.get_positions_data()
 
-            except Exception as e:
-                logger.error(f"Error in positions endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": []
-                    }
-                )
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": positions_data
+            }
 
         @self.app.get("/health")
         async def health_check():
@@ -477,144 +452,77 @@ class BingXEmulatorAPI:
         @self.app.get("/api/v1/trading/summary")
         async def get_trading_summary():
             """Get trading summary"""
-            try:
-                summary = self.trade_logger.get_trade_summary()
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": summary
-                }
-            except Exception as e:
-                logger.error(f"Error in trading summary endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": {}
-                    }
-                )
+            summary = self.trade_logger.get_trade_summary()
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": summary
+            }
 
         @self.app.post("/api/v1/state/save")
         async def save_state():
             """Manually save state"""
-            try:
-                self.state_manager.save_all_state(
-                    self.balance_manager, self.order_engine, self.time_manager
-                )
-                return {
-                    "code": 0,
-                    "msg": "State saved successfully",
-                    "data": None
-                }
-            except Exception as e:
-                logger.error(f"Error saving state: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Error saving state: {str(e)}",
-                        "data": None
-                    }
-                )
+            self.state_manager.save_all_state(
+                self.balance_manager, self.order_engine, self.time_manager,
+                force=True, pretty=True, wait=True
+            )
+            return {
+                "code": 0,
+                "msg": "State saved successfully",
+                "data": None
+            }
 
         @self.app.post("/api/v1/state/clear")
         async def clear_state():
             """Clear all saved state"""
-            try:
-                self.state_manager.clear_state()
-                return {
-                    "code": 0,
-                    "msg": "State cleared successfully",
-                    "data": None
-                }
-            except Exception as e:
-                logger.error(f"Error clearing state: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Error clearing state: {str(e)}",
-                        "data": None
-                    }
-                )
+            self.state_manager.clear_state()
+            return {
+                "code": 0,
+                "msg": "State cleared successfully",
+                "data": None
+            }
 
         @self.app.get("/api/v1/time/current")
         async def get_current_time():
             """Get current simulation time"""
-            try:
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": {
-                        "current_time": self.time_manager.format_time_for_api(),
-                        "timestamp": self.time_manager.get_timestamp_ms(),
-                        "start_time": self.time_manager.start_time.isoformat()
-                    }
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": {
+                    "current_time": self.time_manager.format_time_for_api(),
+                    "timestamp": self.time_manager.get_timestamp_ms(),
+                    "start_time": self.time_manager.start_time.isoformat()
                 }
-            except Exception as e:
-                logger.error(f"Error in current time endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": None
-                    }
-                )
+            }
 
         @self.app.post("/api/v1/time/advance")
         async def advance_time(
             steps: int = Body(1, embed=True, description="Number of minutes to advance")
         ):
             """Advance simulation time"""
-            try:
-                self.time_manager.advance_time(steps)
+            self.time_manager.advance_time(steps)
 
-                # Save state after time advance
-                self.state_manager.save_all_state(
-                    self.balance_manager, self.order_engine, self.time_manager
-                )
+            # Schedule state save after time advance
+            self._state_dirty.set()
 
-                return {
-                    "code": 0,
-                    "msg": f"Time advanced by {steps} minutes",
-                    "data": {
-                        "current_time": self.time_manager.format_time_for_api(),
-                        "timestamp": self.time_manager.get_timestamp_ms()
-                    }
+            return {
+                "code": 0,
+                "msg": f"Time advanced by {steps} minutes",
+                "data": {
+                    "current_time": self.time_manager.format_time_for_api(),
+                    "timestamp": self.time_manager.get_timestamp_ms()
                 }
-            except Exception as e:
-                logger.error(f"Error in advance time endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": None
-                    }
-                )
+            }
 
         @self.app.get("/api/v1/config")
         async def get_config():
             """Get current configuration"""
-            try:
-                from src.config.emulator_config import emulator_config
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": emulator_config.config
-                }
-            except Exception as e:
-                logger.error(f"Error in config endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": None
-                    }
-                )
+            from src.config.emulator_config import emulator_config
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": emulator_config.config
+            }
 
         @self.app.post("/api/v1/config/update")
         async def update_config(
@@ -622,51 +530,100 @@ class BingXEmulatorAPI:
             value: Any = Body(..., embed=True, description="New value")
         ):
             """Update configuration"""
-            try:
-                from src.config.emulator_config import emulator_config
-                emulator_config.set(key_path, value)
-                emulator_config.save()
+            from src.config.emulator_config import emulator_config
+            emulator_config.set(key_path, value)
+            emulator_config.save()
 
-                return {
-                    "code": 0,
-                    "msg": f"Configuration updated: {key_path} = {value}",
-                    "data": None
-                }
-            except Exception as e:
-                logger.error(f"Error in config update endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": None
-                    }
-                )
+            return {
+                "code": 0,
+                "msg": f"Configuration updated: {key_path} = {value}",
+                "data": None
+            }
 
         @self.app.get("/api/v1/symbols")
         async def get_available_symbols():
             """Get list of available trading symbols"""
-            try:
-                symbols = self.data_manager.get_available_symbols()
+            symbols = self.data_manager.get_available_symbols()
 
-                return {
-                    "code": 0,
-                    "msg": "success",
-                    "data": {
-                        "symbols": symbols,
-                        "count": len(symbols)
-                    }
+            return {
+                "code": 0,
+                "msg": "success",
+                "data": {
+                    "symbols": symbols,
+                    "count": len(symbols)
                 }
-            except Exception as e:
-                logger.error(f"Error in symbols endpoint: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "code": 500,
-                        "msg": f"Internal error: {str(e)}",
-                        "data": {"symbols": [], "count": 0}
-                    }
-                )
+            }
+
+    def _get_klines_result(self, symbol: str, interval: str, limit: int) -> dict:
+        """
+        Get klines of a symbol as a BingX-style result
+
+        Args:
+            symbol: Trading pair symbol
+            interval: Timeframe interval
+            limit: Number of candles
+
+        Returns:
+            Result dict, code 404 with empty data for unknown symbols
+        """
+        if symbol not in self._available_symbols:
+            return {
+                "code": 404,
+                "msg": f"Symbol {symbol} not found or no data available",
+                "data": []
+            }
+
+        klines = self.data_manager.get_klines(
+            symbol=symbol,
+            interval=interval,
+            limit=limit,
+            current_time=self.time_manager.current_time
+        )
+
+        return {
+            "code": 0,
+            "msg": "success",
+            "data": klines
+        }
+
+    def _get_symbol_arrays(self, symbol: str) -> tuple:
+        """
+        Get cached contiguous price arrays for a symbol
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            (timestamps_ns, high, low, close) numpy arrays
+        """
+        arrays = self._symbol_arrays.get(symbol)
+        if arrays is None:
+            base_df = self.data_manager.load_symbol_data(symbol)
+            arrays = (
+                base_df.index.values.astype('datetime64[ns]').view(np.int64),
+                np.ascontiguousarray(base_df['high'].to_numpy(dtype=settings.SCAN_PRICE_DTYPE)),
+                np.ascontiguousarray(base_df['low'].to_numpy(dtype=settings.SCAN_PRICE_DTYPE)),
+                np.ascontiguousarray(base_df['close'].to_numpy(dtype=np.float64))
+            )
+            self._symbol_arrays[symbol] = arrays
+        return arrays
+
+    def _get_current_bar(self, symbol: str, when) -> Optional[tuple]:
+        """
+        Get the latest candle at or before the given time
+
+        Args:
+            symbol: Trading pair symbol
+            when: Simulation time
+
+        Returns:
+            (close, high, low) or None if no candle exists yet
+        """
+        ts_ns, highs, lows, closes = self._get_symbol_arrays(symbol)
+        i = np.searchsorted(ts_ns, np.datetime64(when, 'ns').astype(np.int64), side='right') - 1
+        if i < 0:
+            return None
+        return float(closes[i]), float(highs[i]), float(lows[i])
 
     def _simulate_immediate_execution(self, order, symbol: str) -> dict:
         """
@@ -681,18 +638,17 @@ class BingXEmulatorAPI:
         """
         try:
             # Get position created by this order
-            position_key = f"{symbol}_{order.position_side.value}"
-            position = self.balance_manager.positions.get(position_key)
+            position = self.balance_manager.positions.get((symbol, order.position_side))
 
             if not position:
                 return None
 
             # Simulate time progression to check TP/SL
-            base_df = self.data_manager.load_symbol_data(symbol)
+            ts_ns, highs, lows, _ = self._get_symbol_arrays(symbol)
             current_time = self.time_manager.current_time
 
-            # Look ahead for TP/SL triggers
-            future_data = base_df[base_df.index > current_time]
+            # Look ahead for TP/SL triggers (first candle after current time)
+            start = np.searchsorted(ts_ns, np.datetime64(current_time, 'ns').astype(np.int64), side='right')
 
             execution_result = {
                 "triggered": False,
@@ -703,65 +659,46 @@ class BingXEmulatorAPI:
                 "execution_time": current_time.isoformat()
             }
 
-            # Check each future candle for TP/SL
-            for timestamp, candle in future_data.iterrows():
-                high = candle['high']
-                low = candle['low']
-                close = candle['close']
-
-                # Check TP/SL conditions
-                if position.take_profit_price:
-                    if position.side.value == "LONG" and high >= position.take_profit_price:
-                        # TP triggered for long position
-                        execution_result.update({
-                            "triggered": True,
-                            "trigger_type": "TP",
-                            "trigger_price": position.take_profit_price,
-                            "trigger_timestamp": timestamp.isoformat(),
-                            "pnl": (position.take_profit_price - position.entry_price) * position.quantity * position.leverage
-                        })
-                        break
-                    elif position.side.value == "SHORT" and low <= position.take_profit_price:
-                        # TP triggered for short position
-                        execution_result.update({
-                            "triggered": True,
-                            "trigger_type": "TP",
-                            "trigger_price": position.take_profit_price,
-                            "trigger_timestamp": timestamp.isoformat(),
-                            "pnl": (position.entry_price - position.take_profit_price) * position.quantity * position.leverage
-                        })
-                        break
-
-                if position.stop_loss_price:
-                    if position.side.value == "LONG" and low <= position.stop_loss_price:
-                        # SL triggered for long position
-                        execution_result.update({
-                            "triggered": True,
-                            "trigger_type": "SL",
-                            "trigger_price": position.stop_loss_price,
-                            "trigger_timestamp": timestamp.isoformat(),
-                            "pnl": (position.stop_loss_price - position.entry_price) * position.quantity * position.leverage
-                        })
-                        break
-                    elif position.side.value == "SHORT" and high >= position.stop_loss_price:
-                        # SL triggered for short position
-                        execution_result.update({
-                            "triggered": True,
-                            "trigger_type": "SL",
-                            "trigger_price": position.stop_loss_price,
-                            "trigger_timestamp": timestamp.isoformat(),
-                            "pnl": (position.entry_price - position.stop_loss_price) * position.quantity * position.leverage
-                        })
-                        break
+            # Hoist position attributes used by the scan and PnL math
+            is_long = position.side == PositionSide.LONG
+            entry_price = position.entry_price
+            quantity = position.quantity
+            leverage = position.leverage
+            tp_price = position.take_profit_price
+            sl_price = position.stop_loss_price
+            end = min(start + settings.IMMEDIATE_LOOKAHEAD_BARS, len(ts_ns))
+            future_high = highs[start:end]
+            future_low = lows[start:end]
+
+            # Find the first future candle hitting TP or SL (unset levels never trigger)
+            k, trigger_kind = scan_tp_sl(
+                future_high, future_low, is_long,
+                tp_price if tp_price else np.nan,
+                sl_price if sl_price else np.nan
+            )
+
+            if k >= 0:
+                if trigger_kind == TRIGGER_TP:
+                    trigger_type, trigger_price = "TP", tp_price
+                else:
+                    trigger_type, trigger_price = "SL", sl_price
+                price_diff = trigger_price - entry_price if is_long else entry_price - trigger_price
+                execution_result["triggered"] = True
+                execution_result["trigger_type"] = trigger_type
+                execution_result["trigger_price"] = trigger_price
+                # Only the triggering candle's timestamp is converted to a datetime
+                trigger_time = ts_ns[start + k].view('datetime64[ns]').astype('datetime64[us]').item()
+                execution_result["trigger_timestamp"] = trigger_time.isoformat()
+                execution_result["pnl"] = price_diff * quantity * leverage
 
             # If no TP/SL triggered, calculate current PnL
             if not execution_result["triggered"]:
                 current_price = self.data_manager.get_current_price(symbol, current_time)
                 if current_price:
-                    if position.side.value == "LONG":
-                        pnl = (current_price - position.entry_price) * position.quantity * position.leverage
+                    if is_long:
+                        pnl = (current_price - entry_price) * quantity * leverage
                     else:
-                        pnl = (position.entry_price - current_price) * position.quantity * position.leverage
+                        pnl = (entry_price - current_price) * quantity * leverage
 
                     execution_result["pnl"] = pnl
 
@@ -771,13 +708,40 @@ class BingXEmulatorAPI:
             logger.error(f"Error in immediate execution simulation: {e}")
             return None
 
-    def run(self, host: str = None, port: int = None):
-        """Run the API server"""
-        host = host or settings.API_HOST
-        port = port or settings.API_PORT
-
-        logger.info(f"Starting BingX Emulator API on {host}:{port}")
-        uvicorn.run(self.app, host=host, port=port)
-
-# Global API instance
-api_server = BingXEmulatorAPI()
\ No newline at end of file
+# Global API instance, created on first use
+_api_server: Optional[BingXEmulatorAPI] = None
+
+def get_api_server() -> BingXEmulatorAPI:
+    """Get the global API instance, creating it on first call"""
+    global _api_server
+    if _api_server is None:
+        _api_server = BingXEmulatorAPI()
+    return _api_server
+
+def get_app() -> FastAPI:
+    """App factory for `uvicorn src.api.server:get_app --factory`"""
+    return get_api_server().app
+
+def run(host: str = None, port: int = None):
+    """Run the API server"""
+    host = host or settings.API_HOST
+    port = port or settings.API_PORT
+
+    uds = settings.API_UDS
+    logger.info("Starting BingX Emulator API on %s", uds or f"{host}:{port}")
+    # loop/http default to "auto", which picks uvloop and httptools when installed
+    if settings.API_WORKERS > 1:
+        logger.warning(
+            "API_WORKERS=%d: every worker keeps its own balances, positions and orders, "
+            "so trading requests land on unrelated accounts and saved state is whatever "
+            "worker exits last. Only use this for read-only klines/depth load.",
+            settings.API_WORKERS)
+        # The parent only supervises; building the API here would load state and
+        # save it over the workers' on exit, so each worker builds its own app
+        uvicorn.run("src.api.server:get_app", factory=True, host=host, port=port, uds=uds,
+                    workers=settings.API_WORKERS)
+    else:
+        uvicorn.run(get_api_server().app, host=host, port=port, uds=uds)
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
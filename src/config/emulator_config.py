@@ -1,7 +1,7 @@
 """
 Emulator Configuration
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, FrozenSet
 import json
 from pathlib import Path
 
@@ -17,6 +17,8 @@ class EmulatorConfig:
     def __init__(self, config_path: str = "config/emulator_config.json"):
         self.config_path = Path(config_path)
         self.config = self._load_default_config()
+        self._paths: Dict[str, Any] = {}  # "a.b.c" -> value, rebuilt whenever config changes
+        self._supported_symbols: FrozenSet[str] = frozenset()  # Rebuilt with _paths
         self._load_config()
 
     def _load_default_config(self) -> Dict[str, Any]:
@@ -76,21 +78,41 @@ class EmulatorConfig:
 
                 # Merge with defaults
                 self._merge_config(self.config, file_config)
-                logger.info(f"Configuration loaded from {self.config_path}")
+                logger.info("Configuration loaded from %s", self.config_path)
             else:
                 self._save_config()
-                logger.info(f"Default configuration saved to {self.config_path}")
+                logger.info("Default configuration saved to %s", self.config_path)
 
         except Exception as e:
-            logger.error(f"Error loading configuration: {e}")
+            logger.error("Error loading configuration: %s", e)
+
+        self._build_paths()
+
+    def _build_paths(self):
+        """Flatten config into a dot-path lookup table, including intermediate dicts"""
+        paths = {}
+        stack = [("", self.config)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = f"{prefix}{key}"
+                paths[path] = value
+                if isinstance(value, dict):
+                    stack.append((f"{path}.", value))
+        self._paths = paths
+        self._supported_symbols = frozenset(self.config.get("supported_symbols", []))
 
     def _merge_config(self, default: Dict, override: Dict):
-        """Recursively merge configuration dictionaries"""
-        for key, value in override.items():
-            if key in default and isinstance(default[key], dict) and isinstance(value, dict):
-                self._merge_config(default[key], value)
-            else:
-                default[key] = value
+        """Merge override into default in place, descending only into overridden dicts"""
+        stack = [(default, override)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    stack.append((current, value))
+                else:
+                    target[key] = value
 
     def _save_config(self):
         """Save current configuration to file"""
@@ -98,9 +120,9 @@ class EmulatorConfig:
             self.config_path.parent.mkdir(exist_ok=True)
             with open(self.config_path, 'w') as f:
                 json.dump(self.config, f, indent=2, default=str)
-            logger.info(f"Configuration saved to {self.config_path}")
+            logger.info("Configuration saved to %s", self.config_path)
         except Exception as e:
-            logger.error(f"Error saving configuration: {e}")
+            logger.error("Error saving configuration: %s", e)
 
     def get(self, key_path: str, default=None):
         """
@@ -113,16 +135,7 @@ class EmulatorConfig:
         Returns:
             Configuration value
         """
-        try:
-            keys = key_path.split('.')
-            value = self.config
-
-            for key in keys:
-                value = value[key]
-
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._paths.get(key_path, default)
 
     def set(self, key_path: str, value):
         """
@@ -144,10 +157,11 @@ class EmulatorConfig:
 
             # Set the value
             config[keys[-1]] = value
-            logger.info(f"Configuration updated: {key_path} = {value}")
+            self._build_paths()
+            logger.info("Configuration updated: %s = %s", key_path, value)
 
         except Exception as e:
-            logger.error(f"Error setting configuration {key_path}: {e}")
+            logger.error("Error setting configuration %s: %s", key_path, e)
 
     def save(self):
         """Save current configuration to file"""
@@ -175,7 +189,7 @@ class EmulatorConfig:
 
     def is_symbol_supported(self, symbol: str) -> bool:
         """Check if symbol is supported"""
-        return symbol in self.get_supported_symbols()
+        return symbol in self._supported_symbols
 
 # Global configuration instance
 emulator_config = EmulatorConfig()
\ No newline at end of file
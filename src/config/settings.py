@@ -2,18 +2,23 @@
 Configuration settings for BingX Emulator
 """
 from typing import Dict, Any
+import bisect
 import os
 
 class Settings:
     # API Settings
     API_HOST = "0.0.0.0"
     API_PORT = 8000
+    API_WORKERS = 1  # Workers do not share trading state or rotate trade logs, so >1 only suits read-only use
+    API_UDS = None  # Unix socket path to listen on instead of host:port, for same-host clients
+    API_GZIP_MIN_SIZE = 0  # Gzip responses of at least this many bytes for clients accepting it, 0 disables
 
     # Trading Settings
     DEFAULT_LEVERAGE = 10
     DEFAULT_BALANCE = 1000.0  # USDT
     COMMISSION_RATE = 0.0007  # 0.07%
     MIN_COMMISSION = 0.04  # USDT
+    ORDER_HISTORY_MAX = 100000  # Filled/cancelled orders kept, oldest are dropped first
 
     # Slippage settings (volume in USDT -> slippage percentage)
     SLIPPAGE_CONFIG = {
@@ -22,26 +27,40 @@ class Settings:
         1000: 0.001,    # 0.1% for large orders
         10000: 0.002    # 0.2% for very large orders
     }
+    # Thresholds ascending with matching slippage, for bisect lookups
+    _SLIPPAGE_THRESHOLDS = tuple(sorted(SLIPPAGE_CONFIG))
+    _SLIPPAGE_VALUES = tuple(map(SLIPPAGE_CONFIG.get, _SLIPPAGE_THRESHOLDS))
 
     # Data paths
     KLINES_DATA_PATH = "klines_data"
     STATE_DATA_PATH = "data"
 
+    # State persistence
+    STATE_SAVE_DEBOUNCE = 0.2  # seconds to coalesce state changes before saving
+
     # Time settings
     DEFAULT_TIMEFRAME = "5m"
     BASE_TIMEFRAME = "1m"
 
+    # Immediate execution settings
+    IMMEDIATE_LOOKAHEAD_BARS = 10000  # Max future candles scanned for TP/SL
+    # dtype of cached candle highs/lows scanned for TP/SL. "float32" halves their
+    # memory but keeps only ~7 significant digits, so a level within that
+    # distance of a high/low can trigger differently. Closes stay float64.
+    SCAN_PRICE_DTYPE = "float64"
+
     # Logging
     LOG_LEVEL = "INFO"
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    TRADE_LOG_QUEUE_SIZE = 100000  # Trade log entries waiting for the writer thread
+    TRADE_SUMMARY_BUCKETS = False  # Serve trade summaries from per-minute counters (minute resolution)
+    TRADE_LOG_ROTATE_BYTES = 64 * 1024 * 1024  # Log file size that starts a new segment, 0 never rotates
 
     @classmethod
     def get_slippage(cls, volume_usdt: float) -> float:
         """Get slippage percentage based on order volume"""
-        for threshold, slippage in sorted(cls.SLIPPAGE_CONFIG.items(), reverse=True):
-            if volume_usdt >= threshold:
-                return slippage
-        return cls.SLIPPAGE_CONFIG[0]
+        i = bisect.bisect_right(cls._SLIPPAGE_THRESHOLDS, volume_usdt) - 1
+        return cls._SLIPPAGE_VALUES[max(i, 0)]
 
 # Global settings instance
 settings = Settings()
\ No newline at end of file
@@ -1,18 +1,30 @@
 """
 State Manager for persisting emulator state between runs
 """
-import json
+import copy
+import orjson
 import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Deque, Dict, Any, Optional
 from pathlib import Path
 
-from src.trading.models import Order, Position, Balance
+from src.trading.models import Order, Position, PositionKey, Balance, OrderSide, OrderType, PositionSide, OrderStatus
 from src.utils.logger import setup_logger
 from src.config.settings import settings
 
 logger = setup_logger(__name__)
 
+# Enum members by stored value, cheaper than calling the enum class per record
+_ORDER_SIDES = {member.value: member for member in OrderSide}
+_ORDER_TYPES = {member.value: member for member in OrderType}
+_POSITION_SIDES = {member.value: member for member in PositionSide}
+_ORDER_STATUSES = {member.value: member for member in OrderStatus}
+
 class StateManager:
     """
     Manages persistence of emulator state
@@ -32,211 +44,332 @@ class StateManager:
         self.balances_file = self.state_path / "balances.json"
         self.positions_file = self.state_path / "positions.json"
         self.orders_file = self.state_path / "orders.json"
-        self.order_history_file = self.state_path / "order_history.json"
+        self.order_history_file = self.state_path / "order_history.ndjson"
+        self.legacy_order_history_file = self.state_path / "order_history.json"
         self.simulation_state_file = self.state_path / "simulation_state.json"
 
-    def save_balances(self, balances: Dict[str, Balance]):
+        # History deque and its last order queued for disk; orders after it are
+        # appended to the file, anything else rewrites it
+        self._history_tail = None
+        self._history_truncated = False
+
+        # History orders waiting for the writer and whether they replace the file
+        self._history_lock = threading.Lock()
+        self._history_pending = []
+        self._history_rewrite = True
+
+        # Components changed since they were last written; all start dirty so
+        # the first save writes everything
+        self._dirty = {"balances": True, "positions": True, "orders": True, "history": True}
+
+        # Read buffer reused across loads, grown to the largest state file
+        self._read_buf = bytearray()
+
+        # One worker per state file so snapshots are written concurrently
+        self._save_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="state-save")
+
+        # save_all_state queues snapshots for the writer thread and returns
+        self._save_queue: "queue.Queue[tuple]" = queue.Queue()
+        threading.Thread(target=self._writer_loop, name="state-writer", daemon=True).start()
+
+    @contextmanager
+    def _atomic_open(self, path: Path):
+        """Write to a temp file and move it over path only once fully written"""
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        try:
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                yield f
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def mark_dirty(self, kind: str):
+        """
+        Mark a state component as changed since the last save
+
+        Args:
+            kind: "balances", "positions", "orders" or "history"
+        """
+        self._dirty[kind] = True
+
+    def _read_json(self, path: Path) -> Any:
+        """
+        Parse a JSON file through the shared read buffer
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if len(self._read_buf) < size:
+                self._read_buf = bytearray(size)
+
+            view = memoryview(self._read_buf)[:size]
+            return orjson.loads(view[:f.readinto(view)])
+
+    @staticmethod
+    def _order_from_dict(data: Dict[str, Any]) -> Order:
+        """Build an Order from its to_dict() form"""
+        # Positional arguments in Order field order
+        return Order(
+            data['orderId'],
+            data['symbol'],
+            _ORDER_SIDES[data['side']],
+            _POSITION_SIDES[data['positionSide']],
+            _ORDER_TYPES[data['type']],
+            float(data['quantity']),
+            float(data['price']),
+            float(data['executedPrice']),
+            float(data['executedQty']),
+            _ORDER_STATUSES[data['status']],
+            float(data['takeProfit']) if data.get('takeProfit') else None,
+            float(data['stopLoss']) if data.get('stopLoss') else None,
+            float(data['commission']),
+            data['createTime'],
+            data.get('updateTime') or None
+        )
+
+    @staticmethod
+    def _position_from_dict(data: Dict[str, Any]) -> Position:
+        """Build a Position from its to_dict() form"""
+        # Positional arguments in Position field order
+        return Position(
+            data['symbol'],
+            _POSITION_SIDES[data['side']],
+            float(data['quantity']),
+            float(data['entryPrice']),
+            float(data['markPrice']),
+            float(data['unrealizedPnl']),
+            float(data['realizedPnl']),
+            int(data['leverage']),
+            float(data['margin']),
+            float(data['takeProfit']) if data.get('takeProfit') else None,
+            float(data['stopLoss']) if data.get('stopLoss') else None
+        )
+
+    def save_balances(self, balances: Dict[str, Balance], pretty: bool = False) -> bool:
         """Save balances to file"""
         try:
             balances_data = {
                 asset: balance.to_dict() for asset, balance in balances.items()
             }
 
-            with open(self.balances_file, 'w') as f:
-                json.dump(balances_data, f, indent=2, default=str)
+            with self._atomic_open(self.balances_file) as f:
+                f.write(self._dumps(balances_data, pretty))
 
-            logger.info(f"Balances saved to {self.balances_file}")
+            logger.info("Balances saved to %s", self.balances_file)
+            return True
 
         except Exception as e:
-            logger.error(f"Error saving balances: {e}")
+            logger.error("Error saving balances: %s", e)
+            return False
 
     def load_balances(self) -> Dict[str, Balance]:
         """Load balances from file"""
         try:
-            if not self.balances_file.exists():
+            try:
+                balances_data = self._read_json(self.balances_file)
+            except FileNotFoundError:
                 logger.info("No saved balances found, using defaults")
                 return {}
 
-            with open(self.balances_file, 'r') as f:
-                balances_data = json.load(f)
-
-            balances = {}
-            for asset, data in balances_data.items():
-                balance = Balance(
+            balances = {
+                asset: Balance(
                     asset=data['asset'],
                     free=float(data['free']),
                     locked=float(data['locked']),
                     total=float(data['total'])
                 )
-                balances[asset] = balance
+                for asset, data in balances_data.items()
+            }
 
-            logger.info(f"Balances loaded from {self.balances_file}")
+            logger.info("Balances loaded from %s", self.balances_file)
             return balances
 
         except Exception as e:
-            logger.error(f"Error loading balances: {e}")
+            logger.error("Error loading balances: %s", e)
             return {}
 
-    def save_positions(self, positions: Dict[str, Position]):
+    def save_positions(self, positions: Dict[PositionKey, Position], pretty: bool = False) -> bool:
         """Save positions to file"""
         try:
+            # JSON keys are strings, stored as "SYMBOL_SIDE"
             positions_data = {
-                pos_key: position.to_dict() for pos_key, position in positions.items()
+                f"{symbol}_{side.value}": position.to_dict() for (symbol, side), position in positions.items()
             }
 
-            with open(self.positions_file, 'w') as f:
-                json.dump(positions_data, f, indent=2, default=str)
+            with self._atomic_open(self.positions_file) as f:
+                f.write(self._dumps(positions_data, pretty))
 
-            logger.info(f"Positions saved to {self.positions_file}")
+            logger.info("Positions saved to %s", self.positions_file)
+            return True
 
         except Exception as e:
-            logger.error(f"Error saving positions: {e}")
+            logger.error("Error saving positions: %s", e)
+            return False
 
-    def load_positions(self) -> Dict[str, Position]:
+    def load_positions(self) -> Dict[PositionKey, Position]:
         """Load positions from file"""
         try:
-            if not self.positions_file.exists():
+            try:
+                positions_data = self._read_json(self.positions_file)
+            except FileNotFoundError:
                 logger.info("No saved positions found")
                 return {}
 
-            with open(self.positions_file, 'r') as f:
-                positions_data = json.load(f)
-
             positions = {}
-            for pos_key, data in positions_data.items():
-                from src.trading.models import PositionSide
-
-                position = Position(
-                    symbol=data['symbol'],
-                    side=PositionSide(data['side']),
-                    quantity=float(data['quantity']),
-                    entry_price=float(data['entryPrice']),
-                    current_price=float(data['markPrice']),
-                    unrealized_pnl=float(data['unrealizedPnl']),
-                    realized_pnl=float(data['realizedPnl']),
-                    leverage=int(data['leverage']),
-                    margin=float(data['margin']),
-                    take_profit_price=float(data['takeProfit']) if data.get('takeProfit') else None,
-                    stop_loss_price=float(data['stopLoss']) if data.get('stopLoss') else None
-                )
-                positions[pos_key] = position
+            for data in positions_data.values():
+                position = self._position_from_dict(data)
+                positions[(position.symbol, position.side)] = position
 
-            logger.info(f"Positions loaded from {self.positions_file}")
+            logger.info("Positions loaded from %s", self.positions_file)
             return positions
 
         except Exception as e:
-            logger.error(f"Error loading positions: {e}")
+            logger.error("Error loading positions: %s", e)
             return {}
 
-    def save_orders(self, orders: Dict[str, Order]):
+    def save_orders(self, orders: Dict[str, Order], pretty: bool = False) -> bool:
         """Save open orders to file"""
         try:
             orders_data = {
                 order_id: order.to_dict() for order_id, order in orders.items()
             }
 
-            with open(self.orders_file, 'w') as f:
-                json.dump(orders_data, f, indent=2, default=str)
+            with self._atomic_open(self.orders_file) as f:
+                f.write(self._dumps(orders_data, pretty))
 
-            logger.info(f"Orders saved to {self.orders_file}")
+            logger.info("Orders saved to %s", self.orders_file)
+            return True
 
         except Exception as e:
-            logger.error(f"Error saving orders: {e}")
+            logger.error("Error saving orders: %s", e)
+            return False
 
     def load_orders(self) -> Dict[str, Order]:
         """Load open orders from file"""
         try:
-            if not self.orders_file.exists():
+            try:
+                orders_data = self._read_json(self.orders_file)
+            except FileNotFoundError:
                 logger.info("No saved orders found")
                 return {}
 
-            with open(self.orders_file, 'r') as f:
-                orders_data = json.load(f)
-
-            orders = {}
-            for order_id, data in orders_data.items():
-                from src.trading.models import OrderSide, OrderType, PositionSide, OrderStatus
-
-                order = Order(
-                    id=data['orderId'],
-                    symbol=data['symbol'],
-                    side=OrderSide(data['side']),
-                    position_side=PositionSide(data['positionSide']),
-                    order_type=OrderType(data['type']),
-                    quantity=float(data['quantity']),
-                    price=float(data['price']),
-                    executed_price=float(data['executedPrice']),
-                    executed_quantity=float(data['executedQty']),
-                    status=OrderStatus(data['status']),
-                    take_profit_price=float(data['takeProfit']) if data.get('takeProfit') else None,
-                    stop_loss_price=float(data['stopLoss']) if data.get('stopLoss') else None,
-                    commission=float(data['commission']),
-                    created_time=datetime.fromtimestamp(int(data['createTime']) / 1000),
-                    executed_time=datetime.fromtimestamp(int(data['updateTime']) / 1000) if data.get('updateTime') else None
-                )
-                orders[order_id] = order
+            orders = {order_id: self._order_from_dict(data) for order_id, data in orders_data.items()}
 
-            logger.info(f"Orders loaded from {self.orders_file}")
+            logger.info("Orders loaded from %s", self.orders_file)
             return orders
 
         except Exception as e:
-            logger.error(f"Error loading orders: {e}")
+            logger.error("Error loading orders: %s", e)
             return {}
 
-    def save_order_history(self, order_history: list):
-        """Save order history to file"""
-        try:
-            history_data = [order.to_dict() for order in order_history]
-
-            with open(self.order_history_file, 'w') as f:
-                json.dump(history_data, f, indent=2, default=str)
+    def save_order_history(self, order_history, append: bool = False) -> bool:
+        """
+        Save order history to file
 
-            logger.info(f"Order history saved to {self.order_history_file}")
+        Args:
+            order_history: Orders to write, oldest first
+            append: Add the orders to the end of the file instead of replacing it
+        """
+        try:
+            if append:
+                with open(self.order_history_file, 'ab') as f:
+                    for order in order_history:
+                        f.write(orjson.dumps(order.to_dict()) + b'\n')
+            else:
+                with self._atomic_open(self.order_history_file) as f:
+                    for order in order_history:
+                        f.write(orjson.dumps(order.to_dict()) + b'\n')
+                self.legacy_order_history_file.unlink(missing_ok=True)
+
+            logger.info("Order history saved to %s", self.order_history_file)
+            return True
 
         except Exception as e:
-            logger.error(f"Error saving order history: {e}")
-
-    def load_order_history(self) -> list:
-        """Load order history from file"""
+            # Force a full rewrite next time, the file may hold a partial line
+            with self._history_lock:
+                self._history_tail = None
+            logger.error("Error saving order history: %s", e)
+            return False
+
+    def _queue_order_history(self, order_history: Deque[Order]):
+        """Queue orders added since the last save, or all of them if the file must be rewritten"""
+        with self._history_lock:
+            tail = self._history_tail
+            new_orders = []
+            if tail is not None and tail[0] is order_history:
+                for order in reversed(order_history):
+                    if order is tail[1]:
+                        break
+                    new_orders.append(order)
+                else:
+                    # The last saved order has been dropped from the ring buffer
+                    tail = None
+
+            if tail is None:
+                self._history_pending = list(order_history)
+                self._history_rewrite = True
+            else:
+                new_orders.reverse()
+                self._history_pending.extend(new_orders)
+
+            self._history_tail = (order_history, order_history[-1]) if order_history else None
+
+    def _flush_order_history(self) -> bool:
+        """Write the queued history orders"""
+        with self._history_lock:
+            orders, rewrite = self._history_pending, self._history_rewrite
+            self._history_pending, self._history_rewrite = [], False
+        return self.save_order_history(orders, append=not rewrite)
+
+    def load_order_history(self) -> Deque[Order]:
+        """Load order history from file, keeping the newest settings.ORDER_HISTORY_MAX orders"""
+        max_orders = settings.ORDER_HISTORY_MAX
         try:
-            if not self.order_history_file.exists():
-                logger.info("No saved order history found")
-                return []
-
-            with open(self.order_history_file, 'r') as f:
-                history_data = json.load(f)
-
-            order_history = []
-            for data in history_data:
-                from src.trading.models import OrderSide, OrderType, PositionSide, OrderStatus
-
-                order = Order(
-                    id=data['orderId'],
-                    symbol=data['symbol'],
-                    side=OrderSide(data['side']),
-                    position_side=PositionSide(data['positionSide']),
-                    order_type=OrderType(data['type']),
-                    quantity=float(data['quantity']),
-                    price=float(data['price']),
-                    executed_price=float(data['executedPrice']),
-                    executed_quantity=float(data['executedQty']),
-                    status=OrderStatus(data['status']),
-                    take_profit_price=float(data['takeProfit']) if data.get('takeProfit') else None,
-                    stop_loss_price=float(data['stopLoss']) if data.get('stopLoss') else None,
-                    commission=float(data['commission']),
-                    created_time=datetime.fromtimestamp(int(data['createTime']) / 1000),
-                    executed_time=datetime.fromtimestamp(int(data['updateTime']) / 1000) if data.get('updateTime') else None
-                )
-                order_history.append(order)
-
-            logger.info(f"Order history loaded from {self.order_history_file}")
+            self._history_truncated = False
+            try:
+                with open(self.order_history_file, 'rb') as f:
+                    history_file, legacy = self.order_history_file, False
+                    records = list(self._iter_order_history(f))
+            except FileNotFoundError:
+                try:
+                    records = self._read_json(self.legacy_order_history_file)
+                except FileNotFoundError:
+                    logger.info("No saved order history found")
+                    return deque(maxlen=max_orders)
+                history_file, legacy = self.legacy_order_history_file, True
+
+            order_history = deque(map(self._order_from_dict, records[-max_orders:]), maxlen=max_orders)
+
+            # Appends continue from here once this deque is handed to the engine;
+            # legacy, damaged or over-long files are rewritten on the next save
+            resumable = not (legacy or self._history_truncated or len(records) > max_orders)
+            with self._history_lock:
+                self._history_tail = (order_history, order_history[-1]) if resumable and order_history else None
+                self._history_pending, self._history_rewrite = [], False
+
+            logger.info("Order history loaded from %s", history_file)
             return order_history
 
         except Exception as e:
-            logger.error(f"Error loading order history: {e}")
-            return []
-
-    def save_simulation_state(self, current_time: datetime, total_pnl: float):
+            logger.error("Error loading order history: %s", e)
+            return deque(maxlen=max_orders)
+
+    def _iter_order_history(self, f):
+        """Yield order history records from an NDJSON file one line at a time"""
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # A save interrupted mid-append leaves a truncated last line
+                self._history_truncated = True
+                logger.warning("Skipping unreadable order history record in %s", self.order_history_file)
+
+    def save_simulation_state(self, current_time: datetime, total_pnl: float, pretty: bool = False) -> bool:
         """Save simulation state"""
         try:
             state_data = {
@@ -245,56 +378,133 @@ class StateManager:
                 "last_save": datetime.now().isoformat()
             }
 
-            with open(self.simulation_state_file, 'w') as f:
-                json.dump(state_data, f, indent=2, default=str)
+            with self._atomic_open(self.simulation_state_file) as f:
+                f.write(self._dumps(state_data, pretty))
 
-            logger.info(f"Simulation state saved to {self.simulation_state_file}")
+            logger.info("Simulation state saved to %s", self.simulation_state_file)
+            return True
 
         except Exception as e:
-            logger.error(f"Error saving simulation state: {e}")
+            logger.error("Error saving simulation state: %s", e)
+            return False
 
     def load_simulation_state(self) -> tuple[Optional[datetime], float]:
         """Load simulation state"""
         try:
-            if not self.simulation_state_file.exists():
+            try:
+                state_data = self._read_json(self.simulation_state_file)
+            except FileNotFoundError:
                 logger.info("No saved simulation state found")
                 return None, 0.0
 
-            with open(self.simulation_state_file, 'r') as f:
-                state_data = json.load(f)
-
             current_time = datetime.fromisoformat(state_data['current_time'])
             total_pnl = float(state_data['total_pnl'])
 
-            logger.info(f"Simulation state loaded from {self.simulation_state_file}")
+            logger.info("Simulation state loaded from %s", self.simulation_state_file)
             return current_time, total_pnl
 
         except Exception as e:
-            logger.error(f"Error loading simulation state: {e}")
+            logger.error("Error loading simulation state: %s", e)
             return None, 0.0
 
-    def save_all_state(self, balance_manager, order_engine, time_manager):
-        """Save all state"""
-        try:
-            # Save balances
-            self.save_balances(balance_manager.balances)
-
-            # Save positions
-            self.save_positions(balance_manager.positions)
+    @staticmethod
+    def _dumps(data: Any, pretty: bool) -> bytes:
+        """Serialize state compactly, or indented for people reading the files"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(data)
 
-            # Save orders
-            self.save_orders(order_engine.orders)
+    def _submit_save(self, save, *args) -> Future:
+        """Run a save_* method on the save executor"""
+        try:
+            return self._save_executor.submit(save, *args)
+        except RuntimeError:
+            # No new work is accepted during interpreter shutdown (atexit saves)
+            future = Future()
+            future.set_result(save(*args))
+            return future
+
+    def save_all_state(self, balance_manager, order_engine, time_manager,
+                       force: bool = False, pretty: bool = False, wait: bool = False):
+        """
+        Queue a snapshot of all state for the background writer
 
-            # Save order history
-            self.save_order_history(order_engine.order_history)
+        Args:
+            balance_manager: BalanceManager instance
+            order_engine: OrderEngine instance
+            time_manager: TimeManager instance
+            force: Write every component, not just the ones marked dirty
+            pretty: Indent the JSON files (manual saves)
+            wait: Block until the snapshot has been written
+        """
+        try:
+            # Objects are copied here so the writer never sees them mid-update.
+            # New history orders are queued here for the same reason.
+            snapshot = {
+                "simulation": (self.save_simulation_state,
+                               (time_manager.current_time, balance_manager.total_pnl, pretty))
+            }
+            if force or self._dirty["balances"]:
+                snapshot["balances"] = (self.save_balances, (self._copy_items(balance_manager.balances), pretty))
+            if force or self._dirty["positions"]:
+                snapshot["positions"] = (self.save_positions, (self._copy_items(balance_manager.positions), pretty))
+            if force or self._dirty["orders"]:
+                snapshot["orders"] = (self.save_orders, (self._copy_items(order_engine.orders), pretty))
+            if force or self._dirty["history"]:
+                self._queue_order_history(order_engine.order_history)
+                snapshot["history"] = (self._flush_order_history, ())
+
+            # Cleared when queued so changes made meanwhile are kept dirty
+            for kind in snapshot:
+                if kind in self._dirty:
+                    self._dirty[kind] = False
+
+            done = threading.Event()
+            self._save_queue.put((snapshot, done))
+            if wait:
+                done.wait()
 
-            # Save simulation state
-            self.save_simulation_state(time_manager.current_time, balance_manager.total_pnl)
+        except Exception as e:
+            logger.error("Error saving all state: %s", e)
+
+    @staticmethod
+    def _copy_items(items: Dict[str, Any]) -> Dict[str, Any]:
+        """Shallow-copy each object of a state dict"""
+        return {key: copy.copy(obj) for key, obj in items.items()}
+
+    def _writer_loop(self):
+        """Write queued snapshots, merging any that piled up into one write"""
+        while True:
+            snapshot, done = self._save_queue.get()
+            waiters = [done]
+            while True:
+                try:
+                    newer, done = self._save_queue.get_nowait()
+                except queue.Empty:
+                    break
+                # Newer data replaces older per component, dirty ones are kept
+                snapshot.update(newer)
+                waiters.append(done)
+
+            try:
+                self._write_snapshot(snapshot)
+            finally:
+                for done in waiters:
+                    done.set()
+                    self._save_queue.task_done()
+
+    def _write_snapshot(self, snapshot: Dict[str, tuple]):
+        """Write the files of a snapshot in parallel"""
+        try:
+            pending = [
+                (kind, self._submit_save(save, *args)) for kind, (save, args) in snapshot.items()
+            ]
+            for kind, future in pending:
+                if not future.result() and kind in self._dirty:
+                    self._dirty[kind] = True
 
             logger.info("All state saved successfully")
 
         except Exception as e:
-            logger.error(f"Error saving all state: {e}")
+            logger.error("Error saving all state: %s", e)
 
     def load_all_state(self, balance_manager, order_engine, time_manager):
         """Load all state"""
@@ -328,17 +538,26 @@ class StateManager:
             logger.info("All state loaded successfully")
 
         except Exception as e:
-            logger.error(f"Error loading all state: {e}")
+            logger.error("Error loading all state: %s", e)
 
     def clear_state(self):
         """Clear all saved state"""
         try:
+            # Let queued writes finish so they cannot recreate the files
+            self._save_queue.join()
+
             for file_path in [self.balances_file, self.positions_file, self.orders_file,
-                            self.order_history_file, self.simulation_state_file]:
-                if file_path.exists():
-                    file_path.unlink()
+                            self.order_history_file, self.legacy_order_history_file,
+                            self.simulation_state_file]:
+                file_path.unlink(missing_ok=True)
+
+            with self._history_lock:
+                self._history_tail = None
+            # Files are gone, so the next save has to write everything again
+            for kind in self._dirty:
+                self._dirty[kind] = True
 
             logger.info("All state cleared")
 
         except Exception as e:
-            logger.error(f"Error clearing state: {e}")
\ No newline at end of file
+            logger.error("Error clearing state: %s", e)
\ No newline at end of file
@@ -9,6 +9,11 @@ from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+def _as_datetime(value: datetime) -> datetime:
+    """Plain datetime of a datetime-like value such as pandas.Timestamp"""
+    # Subclasses like pandas.Timestamp are rejected by orjson in trade logs and state
+    return value.to_pydatetime() if hasattr(value, 'to_pydatetime') else value
+
 class TimeManager:
     """
     Manages simulation time and provides time-based utilities
@@ -21,10 +26,13 @@ class TimeManager:
         Args:
             start_time: Starting time for simulation (defaults to earliest data available)
         """
-        self._current_time = start_time or datetime.now()
+        self._current_time = _as_datetime(start_time) if start_time else datetime.now()
         self._start_time = self._current_time
         self._time_step = timedelta(minutes=1)  # 1-minute steps
+        self._trusted_callbacks: List[Callable] = []  # Run without error handling
         self._callbacks: List[Callable] = []
+        self._5m_boundary: Optional[datetime] = None
+        self._cache_time_fields()
 
     @property
     def current_time(self) -> datetime:
@@ -44,15 +52,26 @@ class TimeManager:
             new_time: New current time
         """
         old_time = self._current_time
+        new_time = _as_datetime(new_time)
         self._current_time = new_time
-        logger.info(f"Time advanced from {old_time} to {new_time}")
+        self._5m_boundary = None
+        self._cache_time_fields()
+        logger.info("Time advanced from %s to %s", old_time, new_time)
 
         # Execute callbacks
+        for callback in self._trusted_callbacks:
+            callback(old_time, new_time)
+
         for callback in self._callbacks:
             try:
                 callback(old_time, new_time)
             except Exception as e:
-                logger.error(f"Error in time callback: {e}")
+                logger.error("Error in time callback: %s", e)
+
+    def _cache_time_fields(self):
+        """Precompute values read by API responses for the current time"""
+        self._timestamp_ms = int(self._current_time.timestamp() * 1000)
+        self._api_time = self._current_time.strftime("%Y-%m-%d %H:%M:%S")
 
     def advance_time(self, steps: int = 1):
         """
@@ -77,9 +96,11 @@ class TimeManager:
         Returns:
             Current 5-minute boundary datetime
         """
-        minutes_since_epoch = self._current_time.minute + self._current_time.hour * 60
-        boundary_minute = (minutes_since_epoch // 5) * 5
-        return self._current_time.replace(minute=boundary_minute, second=0, microsecond=0)
+        # Computed once per time change; an hour is a whole number of 5m periods
+        if self._5m_boundary is None:
+            minute = self._current_time.minute
+            self._5m_boundary = self._current_time.replace(minute=minute - minute % 5, second=0, microsecond=0)
+        return self._5m_boundary
 
     def should_include_next_candle(self) -> bool:
         """
@@ -91,14 +112,18 @@ class TimeManager:
         seconds = self._current_time.second
         return seconds >= 30
 
-    def add_time_callback(self, callback: Callable[[datetime, datetime], None]):
+    def add_time_callback(self, callback: Callable[[datetime, datetime], None], trusted: bool = False):
         """
         Add a callback to be executed when time advances
 
         Args:
             callback: Function to call with (old_time, new_time)
+            trusted: Callback never raises, so skip per-call error handling
         """
-        self._callbacks.append(callback)
+        if trusted:
+            self._trusted_callbacks.append(callback)
+        else:
+            self._callbacks.append(callback)
 
     def get_timestamp_ms(self) -> int:
         """
@@ -107,7 +132,7 @@ class TimeManager:
         Returns:
             Current time in milliseconds since epoch
         """
-        return int(self._current_time.timestamp() * 1000)
+        return self._timestamp_ms
 
     def format_time_for_api(self) -> str:
         """
@@ -116,4 +141,4 @@ class TimeManager:
         Returns:
             Formatted time string
         """
-        return self._current_time.strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
+        return self._api_time
\ No newline at end of file
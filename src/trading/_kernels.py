@@ -0,0 +1,240 @@
+"""
+Compiled kernels for TP/SL price scans and position updates
+"""
+from typing import Tuple
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to NumPy
+    njit = None
+
+TRIGGER_TP = 0
+TRIGGER_SL = 1
+
+def _scan_tp_sl_numpy(high: np.ndarray, low: np.ndarray, is_long: bool,
+                      tp_price: float, sl_price: float) -> Tuple[int, int]:
+    """Vectorized TP/SL scan used when numba is not installed"""
+    tp_hits = high >= tp_price if is_long else low <= tp_price
+    sl_hits = low <= sl_price if is_long else high >= sl_price
+
+    # Earliest hit wins; TP takes precedence over SL on the same candle
+    candidates = []
+    if tp_hits.any():
+        candidates.append((int(tp_hits.argmax()), TRIGGER_TP))
+    if sl_hits.any():
+        candidates.append((int(sl_hits.argmax()), TRIGGER_SL))
+
+    return min(candidates) if candidates else (-1, -1)
+
+def _first_tp_sl_candle_numpy(is_long: np.ndarray, tp: np.ndarray, sl: np.ndarray,
+                              high: np.ndarray, low: np.ndarray) -> int:
+    """Per-position TP/SL scan used when numba is not installed"""
+    first = -1
+    for i in range(is_long.shape[0]):
+        k, _ = _scan_tp_sl_numpy(high, low, bool(is_long[i]), tp[i], sl[i])
+        if k >= 0:
+            # Later positions only matter if they trigger even earlier
+            first = k
+            high, low = high[:k], low[:k]
+    return first
+
+if njit is not None:
+    @njit(cache=True)
+    def _scan_tp_sl_jit(high, low, is_long, tp_price, sl_price):
+        for i in range(high.shape[0]):
+            if is_long:
+                if high[i] >= tp_price:
+                    return i, TRIGGER_TP
+                if low[i] <= sl_price:
+                    return i, TRIGGER_SL
+            else:
+                if low[i] <= tp_price:
+                    return i, TRIGGER_TP
+                if high[i] >= sl_price:
+                    return i, TRIGGER_SL
+        return -1, -1
+
+    @njit(cache=True)
+    def _first_tp_sl_candle_jit(is_long, tp, sl, high, low):
+        for k in range(high.shape[0]):
+            for i in range(tp.shape[0]):
+                if is_long[i]:
+                    if high[k] >= tp[i] or low[k] <= sl[i]:
+                        return k
+                elif low[k] <= tp[i] or high[k] >= sl[i]:
+                    return k
+        return -1
+
+    _scan_tp_sl = _scan_tp_sl_jit
+    _first_tp_sl_candle = _first_tp_sl_candle_jit
+
+    # Compile at import so the first order does not pay for it
+    _scan_tp_sl(np.zeros(1), np.zeros(1), True, np.nan, np.nan)
+    _first_tp_sl_candle(np.ones(1, dtype=np.bool_), np.zeros(1), np.zeros(1), np.zeros(1), np.zeros(1))
+else:
+    _scan_tp_sl = _scan_tp_sl_numpy
+    _first_tp_sl_candle = _first_tp_sl_candle_numpy
+
+def scan_tp_sl(high: np.ndarray, low: np.ndarray, is_long: bool,
+               tp_price: float, sl_price: float) -> Tuple[int, int]:
+    """
+    Find the first candle where TP or SL is hit
+
+    Args:
+        high: Candle highs (float64)
+        low: Candle lows (float64)
+        is_long: True for LONG positions
+        tp_price: Take profit price, NaN if not set
+        sl_price: Stop loss price, NaN if not set
+
+    Returns:
+        (candle index, TRIGGER_TP or TRIGGER_SL), or (-1, -1) if nothing triggers
+    """
+    return _scan_tp_sl(high, low, is_long, tp_price, sl_price)
+
+def first_tp_sl_candle(is_long: np.ndarray, tp: np.ndarray, sl: np.ndarray,
+                       high: np.ndarray, low: np.ndarray) -> int:
+    """
+    Find the first candle where any position hits TP or SL
+
+    Args:
+        is_long: True for LONG positions
+        tp: Take profit prices, NaN where not set
+        sl: Stop loss prices, NaN where not set
+        high: Candle highs (float64)
+        low: Candle lows (float64)
+
+    Returns:
+        Candle index, or -1 if no position triggers
+    """
+    return _first_tp_sl_candle(is_long, tp, sl, high, low)
+
+def _position_pnl_numpy(is_long: np.ndarray, quantity: np.ndarray,
+                        entry_price: np.ndarray, current_price: float) -> np.ndarray:
+    """Vectorized unrealized PnL used when numba is not installed"""
+    return np.where(is_long, current_price - entry_price, entry_price - current_price) * quantity
+
+def _tp_sl_hits_numpy(is_long: np.ndarray, tp: np.ndarray, sl: np.ndarray,
+                      high: float, low: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized TP/SL hit masks used when numba is not installed"""
+    tp_hit = np.where(is_long, high >= tp, low <= tp)
+    sl_hit = np.where(is_long, low <= sl, high >= sl)
+    return tp_hit, sl_hit
+
+def _update_and_scan_numpy(is_long: np.ndarray, quantity: np.ndarray, entry_price: np.ndarray,
+                           tp: np.ndarray, sl: np.ndarray, current_price: float,
+                           high: float, low: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized PnL update and TP/SL check used when numba is not installed"""
+    unrealized_pnl = _position_pnl_numpy(is_long, quantity, entry_price, current_price)
+    tp_hit, sl_hit = _tp_sl_hits_numpy(is_long, tp, sl, high, low)
+    return unrealized_pnl, tp_hit, sl_hit
+
+if njit is not None:
+    # No fastmath: unset TP/SL are NaN and must keep comparing False
+    @njit(cache=True)
+    def _position_pnl_jit(is_long, quantity, entry_price, current_price):
+        out = np.empty(quantity.shape[0])
+        for i in range(quantity.shape[0]):
+            if is_long[i]:
+                out[i] = (current_price - entry_price[i]) * quantity[i]
+            else:
+                out[i] = (entry_price[i] - current_price) * quantity[i]
+        return out
+
+    @njit(cache=True)
+    def _tp_sl_hits_jit(is_long, tp, sl, high, low):
+        tp_hit = np.empty(tp.shape[0], dtype=np.bool_)
+        sl_hit = np.empty(sl.shape[0], dtype=np.bool_)
+        for i in range(tp.shape[0]):
+            if is_long[i]:
+                tp_hit[i] = high >= tp[i]
+                sl_hit[i] = low <= sl[i]
+            else:
+                tp_hit[i] = low <= tp[i]
+                sl_hit[i] = high >= sl[i]
+        return tp_hit, sl_hit
+
+    @njit(cache=True)
+    def _update_and_scan_jit(is_long, quantity, entry_price, tp, sl, current_price, high, low):
+        n = quantity.shape[0]
+        pnl = np.empty(n)
+        tp_hit = np.empty(n, dtype=np.bool_)
+        sl_hit = np.empty(n, dtype=np.bool_)
+        for i in range(n):
+            if is_long[i]:
+                pnl[i] = (current_price - entry_price[i]) * quantity[i]
+                tp_hit[i] = high >= tp[i]
+                sl_hit[i] = low <= sl[i]
+            else:
+                pnl[i] = (entry_price[i] - current_price) * quantity[i]
+                tp_hit[i] = low <= tp[i]
+                sl_hit[i] = high >= sl[i]
+        return pnl, tp_hit, sl_hit
+
+    _position_pnl = _position_pnl_jit
+    _tp_sl_hits = _tp_sl_hits_jit
+    _update_and_scan = _update_and_scan_jit
+
+    _position_pnl(np.ones(1, dtype=np.bool_), np.zeros(1), np.zeros(1), 0.0)
+    _tp_sl_hits(np.ones(1, dtype=np.bool_), np.zeros(1), np.zeros(1), 0.0, 0.0)
+    _update_and_scan(np.ones(1, dtype=np.bool_), np.zeros(1), np.zeros(1),
+                     np.zeros(1), np.zeros(1), 0.0, 0.0, 0.0)
+else:
+    _position_pnl = _position_pnl_numpy
+    _tp_sl_hits = _tp_sl_hits_numpy
+    _update_and_scan = _update_and_scan_numpy
+
+def position_pnl(is_long: np.ndarray, quantity: np.ndarray,
+                 entry_price: np.ndarray, current_price: float) -> np.ndarray:
+    """
+    Compute unrealized PnL of positions at a price
+
+    Args:
+        is_long: True for LONG positions
+        quantity: Position quantities (float64)
+        entry_price: Entry prices (float64)
+        current_price: Current market price
+
+    Returns:
+        Unrealized PnL per position
+    """
+    return _position_pnl(is_long, quantity, entry_price, current_price)
+
+def tp_sl_hits(is_long: np.ndarray, tp: np.ndarray, sl: np.ndarray,
+               high: float, low: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Check which positions reach take profit or stop loss within a candle
+
+    Args:
+        is_long: True for LONG positions
+        tp: Take profit prices, NaN where not set
+        sl: Stop loss prices, NaN where not set
+        high: Candle high
+        low: Candle low
+
+    Returns:
+        (tp_hit, sl_hit) boolean arrays
+    """
+    return _tp_sl_hits(is_long, tp, sl, high, low)
+
+def update_and_scan(is_long: np.ndarray, quantity: np.ndarray, entry_price: np.ndarray,
+                    tp: np.ndarray, sl: np.ndarray, current_price: float,
+                    high: float, low: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute unrealized PnL and TP/SL hits of positions in a single pass
+
+    Args:
+        is_long: True for LONG positions
+        quantity: Position quantities (float64)
+        entry_price: Entry prices (float64)
+        tp: Take profit prices, NaN where not set
+        sl: Stop loss prices, NaN where not set
+        current_price: Current market price
+        high: Candle high
+        low: Candle low
+
+    Returns:
+        (unrealized_pnl, tp_hit, sl_hit) arrays
+    """
+    return _update_and_scan(is_long, quantity, entry_price, tp, sl, current_price, high, low)
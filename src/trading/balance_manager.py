@@ -1,10 +1,13 @@
 """
 Balance Manager for handling account balances and leverage
 """
-from typing import Dict, Optional, List
-from datetime import datetime
+from typing import Dict, Optional, List, Any, Callable
+import numpy as np
+import time
 
-from src.trading.models import Balance, Position
+from src.trading.models import Balance, Position, PositionKey, PositionSide
+from src.trading.position_table import PositionTable
+from src.trading._kernels import position_pnl, update_and_scan
 from src.utils.logger import setup_logger
 from src.config.settings import settings
 
@@ -23,11 +26,82 @@ class BalanceManager:
             initial_balance: Initial USDT balance (defaults to settings)
         """
         self.initial_balance = initial_balance or settings.DEFAULT_BALANCE
-        self.balances: Dict[str, Balance] = {
+
+        # Settings read on every fill, snapshotted to skip module attribute lookups
+        self._commission_rate = settings.COMMISSION_RATE
+        self._min_commission = settings.MIN_COMMISSION
+        self._default_leverage = settings.DEFAULT_LEVERAGE
+        self._get_slippage = settings.get_slippage
+        self._balances: Dict[str, Balance] = {
             "USDT": Balance(asset="USDT", free=self.initial_balance, total=self.initial_balance)
         }
-        self.positions: Dict[str, Position] = {}  # symbol -> Position
-        self.total_pnl = 0.0
+        self._positions: Dict[PositionKey, Position] = {}  # (symbol, side) -> Position
+        self._positions_by_symbol: Dict[str, Dict[PositionKey, Position]] = {}  # symbol -> {key: Position}
+        self._total_pnl = 0.0
+        self._positions_cache: Optional[List[Dict[str, Any]]] = None  # Serialized positions
+        self._summary_cache: Optional[Dict[str, str]] = None  # Account summary
+        self._position_tables: Dict[str, PositionTable] = {}  # symbol -> columnar copy for scans
+        self.on_change: Optional[Callable[[str], None]] = None  # Called with the kind of state changed
+
+    def _notify_change(self, *kinds: str):
+        """Report changed state kinds to the on_change callback"""
+        if self.on_change:
+            for kind in kinds:
+                self.on_change(kind)
+
+    @property
+    def balances(self) -> Dict[str, Balance]:
+        """Balances by asset"""
+        return self._balances
+
+    @balances.setter
+    def balances(self, balances: Dict[str, Balance]):
+        self._balances = balances
+        self._summary_cache = None
+
+    @property
+    def total_pnl(self) -> float:
+        """Realized PnL of all closed positions"""
+        return self._total_pnl
+
+    @total_pnl.setter
+    def total_pnl(self, total_pnl: float):
+        self._total_pnl = total_pnl
+        self._summary_cache = None
+
+    @property
+    def positions(self) -> Dict[PositionKey, Position]:
+        """Open positions by key"""
+        return self._positions
+
+    @positions.setter
+    def positions(self, positions: Dict[PositionKey, Position]):
+        self._positions = positions
+        self._positions_by_symbol = {}
+        for position_key, position in positions.items():
+            self._positions_by_symbol.setdefault(position.symbol, {})[position_key] = position
+        self._positions_cache = None
+        self._summary_cache = None
+        self._position_tables = {}
+
+    def get_position_table(self, symbol: str) -> Optional[PositionTable]:
+        """
+        Get the columnar table of a symbol's positions
+
+        Args:
+            symbol: Trading pair
+
+        Returns:
+            Table rebuilt only after the symbol's positions change, or None
+            if the symbol has no positions
+        """
+        table = self._position_tables.get(symbol)
+        if table is None:
+            positions = self._positions_by_symbol.get(symbol)
+            if not positions:
+                return None
+            table = self._position_tables[symbol] = PositionTable(list(positions.values()))
+        return table
 
     def get_balance(self, asset: str = "USDT") -> Optional[Balance]:
         """Get balance for specific asset"""
@@ -45,6 +119,14 @@ class BalanceManager:
         """Get all positions"""
         return list(self.positions.values())
 
+    def get_positions_data(self) -> List[Dict[str, Any]]:
+        """Get positions as API dicts, rebuilt only after positions change"""
+        # Not thread-safe: the cache is dropped by unlocked mutations on the
+        # event loop, so a threadpool caller could publish a stale list
+        if self._positions_cache is None:
+            self._positions_cache = [pos.to_dict() for pos in self.positions.values()]
+        return self._positions_cache
+
     def calculate_commission(self, order_value: float) -> float:
         """
         Calculate commission for order
@@ -55,8 +137,8 @@ class BalanceManager:
         Returns:
             Commission amount in USDT
         """
-        commission = order_value * settings.COMMISSION_RATE
-        return max(commission, settings.MIN_COMMISSION)
+        commission = order_value * self._commission_rate
+        return max(commission, self._min_commission)
 
     def calculate_slippage(self, order_value: float, current_price: float) -> float:
         """
@@ -69,7 +151,7 @@ class BalanceManager:
         Returns:
             Slippage percentage
         """
-        slippage_pct = settings.get_slippage(order_value)
+        slippage_pct = self._get_slippage(order_value)
         return current_price * slippage_pct
 
     def can_place_order(self, symbol: str, side: str, quantity: float,
@@ -87,7 +169,7 @@ class BalanceManager:
         Returns:
             (can_place, error_message)
         """
-        leverage = leverage or settings.DEFAULT_LEVERAGE
+        leverage = leverage or self._default_leverage
         order_value = quantity * price
         required_margin = order_value / leverage
         commission = self.calculate_commission(order_value)
@@ -115,22 +197,27 @@ class BalanceManager:
         Returns:
             True if successful
         """
+        self._positions_cache = None
+        self._summary_cache = None
+        self._position_tables.pop(order.symbol, None)
+        self._notify_change("balances", "positions")
         try:
             order_value = executed_quantity * executed_price
             commission = self.calculate_commission(order_value)
-            required_margin = order_value / order.leverage if hasattr(order, 'leverage') else order_value / settings.DEFAULT_LEVERAGE
+            required_margin = order_value / order.leverage
 
             # Update USDT balance
             usdt_balance = self.balances["USDT"]
             usdt_balance.free -= (required_margin + commission)
             usdt_balance.total = usdt_balance.free + usdt_balance.locked
+            usdt_balance.invalidate()
 
             # Update or create position
-            position_key = f"{order.symbol}_{order.position_side.value}"
+            position_key = (order.symbol, order.position_side)
+            position = self.positions.get(position_key)
 
-            if position_key in self.positions:
+            if position is not None:
                 # Update existing position
-                position = self.positions[position_key]
                 if order.side.value == order.position_side.value:
                     # Adding to position
                     total_quantity = position.quantity + executed_quantity
@@ -143,7 +230,7 @@ class BalanceManager:
                     if position.quantity <= 0:
                         # Position closed
                         realized_pnl = (executed_price - position.entry_price) * executed_quantity
-                        if order.position_side.value == "SHORT":
+                        if order.position_side == PositionSide.SHORT:
                             realized_pnl = -realized_pnl
 
                         position.realized_pnl += realized_pnl
@@ -152,10 +239,13 @@ class BalanceManager:
                         # Return margin to balance
                         usdt_balance.free += position.margin
                         usdt_balance.total = usdt_balance.free + usdt_balance.locked
+                        usdt_balance.invalidate()
 
                         # Remove position if fully closed
                         if position.quantity <= 0:
                             del self.positions[position_key]
+                            del self._positions_by_symbol[order.symbol][position_key]
+                position.invalidate()
             else:
                 # Create new position
                 position = Position(
@@ -164,25 +254,27 @@ class BalanceManager:
                     quantity=executed_quantity,
                     entry_price=executed_price,
                     current_price=executed_price,
-                    leverage=settings.DEFAULT_LEVERAGE,
+                    leverage=self._default_leverage,
                     margin=required_margin,
                     take_profit_price=order.take_profit_price,
                     stop_loss_price=order.stop_loss_price
                 )
                 self.positions[position_key] = position
+                self._positions_by_symbol.setdefault(order.symbol, {})[position_key] = position
 
             # Update order
             order.executed_price = executed_price
             order.executed_quantity = executed_quantity
             order.commission = commission
             order.status = "FILLED"
-            order.executed_time = datetime.now()
+            order.executed_ms = time.time_ns() // 1_000_000
+            order.invalidate()
 
-            logger.info(f"Order executed: {order.symbol} {order.side.value} {executed_quantity} @ {executed_price}")
+            logger.info("Order executed: %s %s %s @ %s", order.symbol, order.side.value, executed_quantity, executed_price)
             return True
 
         except Exception as e:
-            logger.error(f"Error executing order: {e}")
+            logger.error("Error executing order: %s", e)
             return False
 
     def update_position_prices(self, symbol: str, current_price: float):
@@ -193,15 +285,68 @@ class BalanceManager:
             symbol: Trading pair
             current_price: Current market price
         """
-        for position_key, position in self.positions.items():
-            if position.symbol == symbol:
-                position.current_price = current_price
+        self._positions_cache = None
+        self._summary_cache = None
+        self._notify_change("positions")
+
+        table = self.get_position_table(symbol)
+        if table is None:
+            return
+
+        # Calculate unrealized PnL for all positions of the symbol at once
+        unrealized_pnl = position_pnl(table.side_is_long, table.quantity, table.entry_price, current_price)
+        self._apply_prices(table, current_price, unrealized_pnl)
+
+    def update_and_check(self, symbol: str, current_price: float,
+                         high: float, low: float) -> List[tuple]:
+        """
+        Update position prices and check TP/SL in one pass over the symbol's positions
 
-                # Calculate unrealized PnL
-                if position.side.value == "LONG":
-                    position.unrealized_pnl = (current_price - position.entry_price) * position.quantity
-                else:  # SHORT
-                    position.unrealized_pnl = (position.entry_price - current_price) * position.quantity
+        Args:
+            symbol: Trading pair
+            current_price: Current market price
+            high: Candle high
+            low: Candle low
+
+        Returns:
+            List of (position, trigger_type, trigger_price) tuples
+        """
+        self._positions_cache = None
+        self._summary_cache = None
+        self._notify_change("positions")
+
+        table = self.get_position_table(symbol)
+        if table is None:
+            return []
+
+        # Triggered positions are closed by the caller once this returns
+        unrealized_pnl, tp_hit, sl_hit = update_and_scan(
+            table.side_is_long, table.quantity, table.entry_price,
+            table.tp, table.sl, current_price, high, low
+        )
+        self._apply_prices(table, current_price, unrealized_pnl)
+
+        # A position can hit both within one candle; TP is reported first
+        triggers = []
+        for row in np.flatnonzero(tp_hit | sl_hit).tolist():
+            position = table.rows[row]
+            if tp_hit[row]:
+                triggers.append((position, "TP", position.take_profit_price))
+            if sl_hit[row]:
+                triggers.append((position, "SL", position.stop_loss_price))
+
+        return triggers
+
+    @staticmethod
+    def _apply_prices(table: PositionTable, current_price: float, unrealized_pnl: np.ndarray):
+        """Write a price update back to the table and its Position objects"""
+        table.current_price.fill(current_price)
+        table.unrealized_pnl = unrealized_pnl
+
+        for position, pnl in zip(table.rows, unrealized_pnl.tolist()):
+            position.current_price = current_price
+            position.unrealized_pnl = pnl
+            position.invalidate()
 
     def check_tp_sl(self, symbol: str, current_price: float, high: float, low: float) -> List[Position]:
         """
@@ -216,41 +361,25 @@ class BalanceManager:
         Returns:
             List of positions that should be closed
         """
-        positions_to_close = []
-
-        for position_key, position in list(self.positions.items()):
-            if position.symbol != symbol:
-                continue
-
-            should_close = False
-
-            # Check take profit
-            if position.take_profit_price:
-                if position.side.value == "LONG" and high >= position.take_profit_price:
-                    should_close = True
-                elif position.side.value == "SHORT" and low <= position.take_profit_price:
-                    should_close = True
-
-            # Check stop loss
-            if position.stop_loss_price:
-                if position.side.value == "LONG" and low <= position.stop_loss_price:
-                    should_close = True
-                elif position.side.value == "SHORT" and high >= position.stop_loss_price:
-                    should_close = True
-
-            if should_close:
-                positions_to_close.append(position)
+        table = self.get_position_table(symbol)
+        if table is None:
+            return []
 
-        return positions_to_close
+        # Scans only read the table; positions are closed afterwards through
+        # execute_order, which drops the table, so no copy is needed here
+        tp_hit, sl_hit = table.tp_sl_hits(high, low)
+        return [table.rows[row] for row in np.flatnonzero(tp_hit | sl_hit).tolist()]
 
     def get_account_summary(self) -> Dict:
-        """Get account summary for API response"""
-        total_balance = sum(balance.total for balance in self.balances.values())
-        total_unrealized_pnl = sum(pos.unrealized_pnl for pos in self.positions.values())
-
-        return {
-            "totalBalance": str(total_balance),
-            "totalUnrealizedPnl": str(total_unrealized_pnl),
-            "totalRealizedPnl": str(self.total_pnl),
-            "totalPnl": str(self.total_pnl + total_unrealized_pnl)
-        }
\ No newline at end of file
+        """Get account summary for API response, rebuilt only after balances or positions change"""
+        if self._summary_cache is None:
+            total_balance = sum(balance.total for balance in self._balances.values())
+            total_unrealized_pnl = sum(pos.unrealized_pnl for pos in self._positions.values())
+
+            self._summary_cache = {
+                "totalBalance": str(total_balance),
+                "totalUnrealizedPnl": str(total_unrealized_pnl),
+                "totalRealizedPnl": str(self._total_pnl),
+                "totalPnl": str(self._total_pnl + total_unrealized_pnl)
+            }
+        return self._summary_cache
\ No newline at end of file
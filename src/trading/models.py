@@ -2,11 +2,18 @@
 Trading data models
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
+import time
 import uuid
 
+from src.config.settings import settings
+
+def _now_ms() -> int:
+    """Current wall-clock time in milliseconds since epoch"""
+    return time.time_ns() // 1_000_000
+
 class OrderSide(str, Enum):
     BUY = "BUY"
     SELL = "SELL"
@@ -19,13 +26,16 @@ class PositionSide(str, Enum):
     LONG = "LONG"
     SHORT = "SHORT"
 
+# Positions are keyed by (symbol, side)
+PositionKey = Tuple[str, PositionSide]
+
 class OrderStatus(str, Enum):
     PENDING = "PENDING"
     FILLED = "FILLED"
     CANCELLED = "CANCELLED"
     PARTIALLY_FILLED = "PARTIALLY_FILLED"
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Trading order model"""
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -41,11 +51,43 @@ class Order:
     take_profit_price: Optional[float] = None
     stop_loss_price: Optional[float] = None
     commission: float = 0.0
-    created_time: datetime = field(default_factory=datetime.now)
-    executed_time: Optional[datetime] = None
+    created_ms: int = field(default_factory=_now_ms)  # Milliseconds since epoch
+    executed_ms: Optional[int] = None
+    leverage: int = settings.DEFAULT_LEVERAGE
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate(self):
+        """Drop the cached API dict; call after changing fields"""
+        self._dict_cache = None
+
+    @property
+    def created_time(self) -> datetime:
+        """Creation time as a naive local datetime"""
+        return datetime.fromtimestamp(self.created_ms / 1000)
+
+    @created_time.setter
+    def created_time(self, value: datetime):
+        self.created_ms = int(value.timestamp() * 1000)
+        self._dict_cache = None
+
+    @property
+    def executed_time(self) -> Optional[datetime]:
+        """Execution time as a naive local datetime, None until executed"""
+        return datetime.fromtimestamp(self.executed_ms / 1000) if self.executed_ms is not None else None
+
+    @executed_time.setter
+    def executed_time(self, value: Optional[datetime]):
+        self.executed_ms = int(value.timestamp() * 1000) if value is not None else None
+        self._dict_cache = None
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for API response"""
+        """Convert to dictionary for API response (cached until invalidate())"""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return self._dict_cache
+
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build API response dictionary"""
         return {
             "orderId": self.id,
             "symbol": self.symbol,
@@ -60,11 +102,11 @@ class Order:
             "takeProfit": str(self.take_profit_price) if self.take_profit_price else None,
             "stopLoss": str(self.stop_loss_price) if self.stop_loss_price else None,
             "commission": str(self.commission),
-            "createTime": int(self.created_time.timestamp() * 1000),
-            "updateTime": int(self.executed_time.timestamp() * 1000) if self.executed_time else int(self.created_time.timestamp() * 1000)
+            "createTime": self.created_ms,
+            "updateTime": self.executed_ms if self.executed_ms is not None else self.created_ms
         }
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Position model"""
     symbol: str = ""
@@ -78,9 +120,20 @@ class Position:
     margin: float = 0.0
     take_profit_price: Optional[float] = None
     stop_loss_price: Optional[float] = None
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate(self):
+        """Drop the cached API dict; call after changing fields"""
+        self._dict_cache = None
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for API response"""
+        """Convert to dictionary for API response (cached until the position changes)"""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return self._dict_cache
+
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build API response dictionary"""
         return {
             "symbol": self.symbol,
             "side": self.side.value,
@@ -95,16 +148,27 @@ class Position:
             "stopLoss": str(self.stop_loss_price) if self.stop_loss_price else None
         }
 
-@dataclass
+@dataclass(slots=True)
 class Balance:
     """Balance model"""
     asset: str = "USDT"
     free: float = 0.0
     locked: float = 0.0
     total: float = 0.0
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate(self):
+        """Drop the cached API dict; call after changing fields"""
+        self._dict_cache = None
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for API response"""
+        """Convert to dictionary for API response (cached until the balance changes)"""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return self._dict_cache
+
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build API response dictionary"""
         return {
             "asset": self.asset,
             "free": str(self.free),
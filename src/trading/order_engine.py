@@ -1,11 +1,15 @@
 """
 Order Engine for executing trading orders
 """
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Tuple, Any, Callable
 from datetime import datetime
+import numpy as np
 
 from src.trading.models import Order, OrderSide, OrderType, PositionSide, OrderStatus
 from src.trading.balance_manager import BalanceManager
+from src.trading._kernels import first_tp_sl_candle
 from src.utils.logger import setup_logger
 from src.config.settings import settings
 
@@ -24,8 +28,31 @@ class OrderEngine:
             balance_manager: BalanceManager instance
         """
         self.balance_manager = balance_manager
-        self.orders: Dict[str, Order] = {}  # order_id -> Order
-        self.order_history: List[Order] = []
+        self._orders: Dict[str, Order] = {}  # order_id -> Order
+        self._pending_market_by_symbol: Dict[str, Dict[str, Order]] = {}  # symbol -> {order_id: Order}
+        self.order_history: Deque[Order] = deque(maxlen=settings.ORDER_HISTORY_MAX)
+        self._open_orders_cache: Optional[List[Dict[str, Any]]] = None  # Serialized open orders
+        self.on_change: Optional[Callable[[str], None]] = None  # Called with the kind of state changed
+
+    def _notify_change(self, *kinds: str):
+        """Report changed state kinds to the on_change callback"""
+        if self.on_change:
+            for kind in kinds:
+                self.on_change(kind)
+
+    @property
+    def orders(self) -> Dict[str, Order]:
+        """Open orders by ID"""
+        return self._orders
+
+    @orders.setter
+    def orders(self, orders: Dict[str, Order]):
+        self._orders = orders
+        self._pending_market_by_symbol = {}
+        for order in orders.values():
+            if order.order_type == OrderType.MARKET:
+                self._pending_market_by_symbol.setdefault(order.symbol, {})[order.id] = order
+        self._open_orders_cache = None
 
     def create_order(self, symbol: str, side: str, quantity: float,
                     order_type: str = "MARKET", price: float = 0.0,
@@ -81,12 +108,10 @@ class OrderEngine:
                 quantity=quantity,
                 price=price,
                 take_profit_price=take_profit,
-                stop_loss_price=stop_loss
+                stop_loss_price=stop_loss,
+                leverage=leverage
             )
 
-            # Add leverage attribute
-            order.leverage = leverage
-
             # Check if order can be placed
             can_place, error_msg = self.balance_manager.can_place_order(
                 symbol, side, quantity, execution_price, leverage
@@ -97,13 +122,17 @@ class OrderEngine:
 
             # Store order
             self.orders[order.id] = order
+            if order.order_type == OrderType.MARKET:
+                self._pending_market_by_symbol.setdefault(symbol, {})[order.id] = order
+            self._open_orders_cache = None
+            self._notify_change("orders")
 
-            logger.info(f"Order created: {order.id} - {symbol} {side} {quantity}")
+            logger.info("Order created: %s - %s %s %s", order.id, symbol, side, quantity)
 
             return True, "Order created successfully", order
 
         except Exception as e:
-            logger.error(f"Error creating order: {e}")
+            logger.error("Error creating order: %s", e)
             return False, f"Error creating order: {str(e)}", None
 
     def execute_market_order(self, order: Order, current_price: float,
@@ -136,20 +165,23 @@ class OrderEngine:
             success = self.balance_manager.execute_order(
                 order, execution_price, order.quantity
             )
+            self._open_orders_cache = None
 
             if success:
                 # Move to history
                 self.order_history.append(order)
                 if order.id in self.orders:
                     del self.orders[order.id]
+                    self._pending_market_by_symbol.get(order.symbol, {}).pop(order.id, None)
+                self._notify_change("orders", "history")
 
-                logger.info(f"Market order executed: {order.symbol} {order.side.value} "
-                          f"{order.quantity} @ {execution_price}")
+                logger.info("Market order executed: %s %s %s @ %s",
+                            order.symbol, order.side.value, order.quantity, execution_price)
 
             return success
 
         except Exception as e:
-            logger.error(f"Error executing market order: {e}")
+            logger.error("Error executing market order: %s", e)
             return False
 
     def process_candle(self, symbol: str, open_price: float, high: float,
@@ -165,18 +197,20 @@ class OrderEngine:
             close: Candle close
             volume: Candle volume
         """
-        try:
-            # Update position prices
-            self.balance_manager.update_position_prices(symbol, close)
+        # Bind hot lookups once per candle
+        create_order = self.create_order
+        execute_market_order = self.execute_market_order
+        long_side = PositionSide.LONG
 
-            # Check TP/SL conditions with improved logic
-            positions_to_close = self._check_tp_sl_improved(symbol, open_price, high, low, close)
+        try:
+            # Update position prices and check TP/SL conditions in one pass
+            positions_to_close = self.balance_manager.update_and_check(symbol, close, high, low)
 
             for position, trigger_type, trigger_price in positions_to_close:
                 # Create closing order
-                closing_side = "SELL" if position.side.value == "LONG" else "BUY"
+                closing_side = "SELL" if position.side == long_side else "BUY"
 
-                success, msg, order = self.create_order(
+                success, msg, order = create_order(
                     symbol=symbol,
                     side=closing_side,
                     quantity=position.quantity,
@@ -185,62 +219,61 @@ class OrderEngine:
 
                 if success and order:
                     # Execute immediately at trigger price
-                    self.execute_market_order(order, trigger_price, high, low)
-                    logger.info(f"{trigger_type} triggered for {symbol}: {position.side.value} "
-                              f"position closed at {trigger_price}")
+                    execute_market_order(order, trigger_price, high, low)
+                    logger.info("%s triggered for %s: %s position closed at %s",
+                                trigger_type, symbol, position.side.value, trigger_price)
 
             # Execute pending market orders
-            pending_orders = [
-                order for order in self.orders.values()
-                if order.symbol == symbol and order.order_type == OrderType.MARKET
-            ]
-
-            for order in pending_orders:
-                self.execute_market_order(order, close, high, low)
+            pending_orders = self._pending_market_by_symbol.get(symbol)
+            if pending_orders:
+                for order in list(pending_orders.values()):
+                    execute_market_order(order, close, high, low)
 
         except Exception as e:
-            logger.error(f"Error processing candle for {symbol}: {e}")
+            logger.error("Error processing candle for %s: %s", symbol, e)
 
-    def _check_tp_sl_improved(self, symbol: str, open_price: float, high: float,
-                             low: float, close: float) -> List[tuple]:
+    def process_candles(self, symbol: str, opens: np.ndarray, highs: np.ndarray,
+                        lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray):
         """
-        Improved TP/SL checking with more precise logic
+        Process a run of candles, equivalent to calling process_candle for each
+
+        Candles on which nothing can fill or trigger only move prices, so they
+        are skipped with one scan over the symbol's positions; only triggering
+        candles and candles with pending market orders go through process_candle.
 
         Args:
             symbol: Trading pair
-            open_price: Candle open price
-            high: Candle high
-            low: Candle low
-            close: Candle close
-
-        Returns:
-            List of (position, trigger_type, trigger_price) tuples
+            opens: Candle opens
+            highs: Candle highs
+            lows: Candle lows
+            closes: Candle closes
+            volumes: Candle volumes
         """
-        positions_to_close = []
-
-        for position_key, position in list(self.balance_manager.positions.items()):
-            if position.symbol != symbol:
-                continue
-
-            # Check take profit
-            if position.take_profit_price:
-                if position.side.value == "LONG" and high >= position.take_profit_price:
-                    # TP triggered for long position
-                    positions_to_close.append((position, "TP", position.take_profit_price))
-                elif position.side.value == "SHORT" and low <= position.take_profit_price:
-                    # TP triggered for short position
-                    positions_to_close.append((position, "TP", position.take_profit_price))
-
-            # Check stop loss
-            if position.stop_loss_price:
-                if position.side.value == "LONG" and low <= position.stop_loss_price:
-                    # SL triggered for long position
-                    positions_to_close.append((position, "SL", position.stop_loss_price))
-                elif position.side.value == "SHORT" and high >= position.stop_loss_price:
-                    # SL triggered for short position
-                    positions_to_close.append((position, "SL", position.stop_loss_price))
-
-        return positions_to_close
+        highs = np.ascontiguousarray(highs, dtype=np.float64)
+        lows = np.ascontiguousarray(lows, dtype=np.float64)
+        balance_manager = self.balance_manager
+        pending_by_symbol = self._pending_market_by_symbol
+        n = len(closes)
+        i = 0
+
+        while i < n:
+            if not pending_by_symbol.get(symbol):
+                table = balance_manager.get_position_table(symbol)
+                if table is None:
+                    k = -1
+                else:
+                    k = first_tp_sl_candle(table.side_is_long, table.tp, table.sl, highs[i:], lows[i:])
+                end = n if k < 0 else i + k
+
+                if end > i:
+                    # Only the last quiet candle's close is visible afterwards
+                    balance_manager.update_position_prices(symbol, float(closes[end - 1]))
+                    i = end
+                    continue
+
+            self.process_candle(symbol, float(opens[i]), float(highs[i]), float(lows[i]),
+                                float(closes[i]), float(volumes[i]))
+            i += 1
 
     def get_order(self, order_id: str) -> Optional[Order]:
         """Get order by ID"""
@@ -253,9 +286,20 @@ class OrderEngine:
             orders = [order for order in orders if order.symbol == symbol]
         return orders
 
+    def get_open_orders_data(self) -> List[Dict[str, Any]]:
+        """Get open orders as API dicts, rebuilt only after orders change"""
+        # Not thread-safe, for the same reason as BalanceManager.get_positions_data
+        if self._open_orders_cache is None:
+            self._open_orders_cache = [order.to_dict() for order in self.orders.values()]
+        return self._open_orders_cache
+
     def get_order_history(self, symbol: str = None, limit: int = 100) -> List[Order]:
         """Get order history"""
-        history = self.order_history[-limit:] if limit else self.order_history
+        if limit:
+            history = list(islice(reversed(self.order_history), limit))
+            history.reverse()
+        else:
+            history = list(self.order_history)
         if symbol:
             history = [order for order in history if order.symbol == symbol]
         return history
@@ -275,10 +319,14 @@ class OrderEngine:
 
         order = self.orders[order_id]
         order.status = OrderStatus.CANCELLED
+        order.invalidate()
 
         # Move to history
         self.order_history.append(order)
         del self.orders[order_id]
+        self._pending_market_by_symbol.get(order.symbol, {}).pop(order_id, None)
+        self._open_orders_cache = None
+        self._notify_change("orders", "history")
 
-        logger.info(f"Order cancelled: {order_id}")
+        logger.info("Order cancelled: %s", order_id)
         return True, "Order cancelled successfully"
\ No newline at end of file
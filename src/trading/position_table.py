@@ -0,0 +1,51 @@
+"""
+Columnar view of open positions for per-candle scans
+"""
+from typing import List, Tuple
+import numpy as np
+
+from src.trading.models import Position, PositionSide
+from src.trading._kernels import tp_sl_hits
+
+class PositionTable:
+    """
+    Positions of one symbol laid out as parallel NumPy arrays (structure of arrays)
+
+    Position objects stay the source of truth for API responses and state
+    files. A symbol's table is rebuilt whenever its positions are opened,
+    changed or closed, so per-candle scans only read contiguous arrays.
+    """
+
+    def __init__(self, positions: List[Position]):
+        """
+        Build the table
+
+        Args:
+            positions: Positions, row i of every array describes positions[i]
+        """
+        self.rows = positions
+        self.side_is_long = np.array([pos.side == PositionSide.LONG for pos in positions], dtype=bool)
+        self.quantity = np.array([pos.quantity for pos in positions], dtype=np.float64)
+        self.entry_price = np.array([pos.entry_price for pos in positions], dtype=np.float64)
+        self.current_price = np.array([pos.current_price for pos in positions], dtype=np.float64)
+        self.unrealized_pnl = np.array([pos.unrealized_pnl for pos in positions], dtype=np.float64)
+
+        # Unset TP/SL are NaN so comparisons against them are always False
+        self.tp = np.array([pos.take_profit_price or np.nan for pos in positions], dtype=np.float64)
+        self.sl = np.array([pos.stop_loss_price or np.nan for pos in positions], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def tp_sl_hits(self, high: float, low: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Check which positions reach take profit or stop loss within a candle
+
+        Args:
+            high: Candle high
+            low: Candle low
+
+        Returns:
+            (tp_hit, sl_hit) boolean arrays aligned with rows
+        """
+        return tp_sl_hits(self.side_is_long, self.tp, self.sl, high, low)
@@ -6,35 +6,28 @@ import sys
 from typing import Optional
 from src.config.settings import settings
 
+# One console handler on the root logger; module loggers propagate to it.
+# basicConfig leaves an already configured root (e.g. an embedding app) alone.
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL.upper()),
+    format=settings.LOG_FORMAT,
+    stream=sys.stdout
+)
+
 def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """
-    Setup logger with consistent formatting
+    Get a module logger; its records go through the shared root handler
 
     Args:
         name: Logger name
         level: Log level (optional, uses settings default if not provided)
 
     Returns:
-        Configured logger instance
+        Logger instance with its level set
     """
     logger = logging.getLogger(name)
 
-    # Avoid adding handlers multiple times
-    if logger.handlers:
-        return logger
-
     log_level = level or settings.LOG_LEVEL
     logger.setLevel(getattr(logging, log_level.upper()))
 
-    # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, log_level.upper()))
-
-    # Create formatter
-    formatter = logging.Formatter(settings.LOG_FORMAT)
-    handler.setFormatter(formatter)
-
-    # Add handler to logger
-    logger.addHandler(handler)
-
-    return logger
\ No newline at end of file
+    return logger
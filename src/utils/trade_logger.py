@@ -1,9 +1,12 @@
 """
 Trade Logger for detailed trading operation logging
 """
-import json
+import orjson
+import os
+import queue
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
 from pathlib import Path
 
 from src.utils.logger import setup_logger
@@ -11,6 +14,130 @@ from src.config.settings import settings
 
 logger = setup_logger(__name__)
 
+# Non-str context keys are stringified as json.dumps did
+_DUMPS_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+# Most entries the writer thread takes from the queue per batch
+_WRITE_BATCH = 1000
+
+# Only the writer thread writes the log files, so raw O_APPEND descriptors
+# replace locked, buffered file objects; each append is a single syscall
+_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+
+_dumps = orjson.dumps
+
+def _write_all(fd: int, data) -> None:
+    """Write a buffer, retrying partial writes (regular files only take them when the disk fills up)"""
+    data = memoryview(data)
+    while data:
+        data = data[os.write(fd, data):]
+
+if hasattr(os, 'writev'):
+    # Most buffers the kernel takes per writev call
+    try:
+        _IOV_MAX = os.sysconf('SC_IOV_MAX')
+    except (AttributeError, ValueError, OSError):
+        _IOV_MAX = 1024
+    if _IOV_MAX <= 0:
+        _IOV_MAX = 1024
+
+    def _write_pieces(fd: int, pieces: list) -> None:
+        """Write byte strings in order, handing them to the kernel without joining them"""
+        for start in range(0, len(pieces), _IOV_MAX):
+            iov = pieces[start:start + _IOV_MAX]
+            written = os.writev(fd, iov)
+            if written < sum(map(len, iov)):
+                _write_all(fd, memoryview(b''.join(iov))[written:])
+else:
+    def _write_pieces(fd: int, pieces: list) -> None:
+        """Write byte strings in order (no writev on this platform)"""
+        _write_all(fd, b''.join(pieces))
+
+def _dumps_entry(log_entry: Dict[str, Any]) -> bytes:
+    """Serialize a free-form log entry"""
+    return _dumps(log_entry, option=_DUMPS_OPTIONS)
+
+# Entries written for every order have a fixed schema: keys are pre-rendered
+# and only the values are encoded per entry
+_ORDER_CREATED = (b'{"timestamp":%b,"type":"order_created","order_id":%b,"symbol":%b,"side":%b,'
+                  b'"quantity":%b,"price":%b,"order_type":%b,"take_profit":%b,"stop_loss":%b}\n')
+_ORDER_EXECUTED = (b'{"timestamp":%b,"type":"order_executed","order_id":%b,"symbol":%b,"side":%b,'
+                   b'"quantity":%b,"execution_price":%b,"commission":%b,"slippage":%b}\n')
+_POSITION_OPENED = (b'{"timestamp":%b,"type":"position_opened","symbol":%b,"side":%b,'
+                    b'"quantity":%b,"entry_price":%b,"leverage":%b,"margin":%b}\n')
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an optional ISO timestamp"""
+    return datetime.fromisoformat(value) if value else None
+
+def _segment_stamp(value: Optional[datetime]) -> str:
+    """Timestamp as used in segment file names"""
+    return value.strftime('%Y%m%dT%H%M%S%f') if value else "unknown"
+
+def _empty_summary() -> Dict[str, Any]:
+    """Zeroed trade summary counters"""
+    return {
+        "total_orders": 0,
+        "total_executions": 0,
+        "total_positions_opened": 0,
+        "total_positions_closed": 0,
+        "total_volume": 0.0,
+        "total_commission": 0.0,
+        "total_pnl": 0.0,
+        "errors": 0
+    }
+
+def _trade_counts(entry: Dict[str, Any]) -> tuple:
+    """Summary counter increments of a trades.jsonl entry"""
+    entry_type = entry['type']
+    if entry_type == 'order_created':
+        return (("total_orders", 1),)
+    if entry_type == 'position_opened':
+        return (("total_positions_opened", 1),)
+    if entry_type == 'position_closed':
+        return (("total_positions_closed", 1), ("total_pnl", entry.get('pnl', 0)))
+    return ()
+
+def _execution_counts(entry: Dict[str, Any]) -> tuple:
+    """Summary counter increments of an executions.jsonl entry"""
+    return (("total_executions", 1),
+            ("total_volume", entry.get('quantity', 0) * entry.get('execution_price', 0)),
+            ("total_commission", entry.get('commission', 0)))
+
+def _error_counts(entry: Dict[str, Any]) -> tuple:
+    """Summary counter increments of an errors.jsonl entry"""
+    return (("errors", 1),)
+
+# JSON strings of symbols, sides and order types; only the writer thread uses it.
+# Enum members are passed as is: orjson writes their value, and str enums
+# hash and compare like their value, so both share one cache entry.
+_names: Dict[str, bytes] = {}
+
+def _name(value: str) -> bytes:
+    """Encode a low-cardinality string, memoized"""
+    encoded = _names.get(value)
+    if encoded is None:
+        encoded = _names[value] = _dumps(value)
+    return encoded
+
+# Renderers get the entry time already encoded; values[0] is the raw time
+def _render_order_created(timestamp: bytes, values: tuple) -> bytes:
+    _, order_id, symbol, side, quantity, price, order_type, take_profit, stop_loss = values
+    return _ORDER_CREATED % (timestamp, _dumps(order_id), _name(symbol), _name(side),
+                             _dumps(quantity), _dumps(price), _name(order_type),
+                             _dumps(take_profit), _dumps(stop_loss))
+
+def _render_order_executed(timestamp: bytes, values: tuple) -> bytes:
+    _, order_id, symbol, side, quantity, execution_price, commission, slippage = values
+    return _ORDER_EXECUTED % (timestamp, _dumps(order_id), _name(symbol), _name(side),
+                              _dumps(quantity), _dumps(execution_price), _dumps(commission),
+                              _dumps(slippage))
+
+def _render_position_opened(timestamp: bytes, values: tuple) -> bytes:
+    _, symbol, side, quantity, entry_price, leverage, margin = values
+    return _POSITION_OPENED % (timestamp, _name(symbol), _name(side), _dumps(quantity),
+                               _dumps(entry_price), _dumps(leverage), _dumps(margin))
+
 class TradeLogger:
     """
     Specialized logger for trading operations
@@ -24,65 +151,107 @@ class TradeLogger:
             log_path: Path to trade logs directory
         """
         self.log_path = Path(log_path or settings.STATE_DATA_PATH) / "logs"
-        self.log_path.mkdir(exist_ok=True)
+        if not os.path.isdir(self.log_path):
+            self.log_path.mkdir(exist_ok=True)
 
         # Log files
         self.trades_file = self.log_path / "trades.jsonl"
         self.executions_file = self.log_path / "executions.jsonl"
         self.errors_file = self.log_path / "errors.jsonl"
+        self.summary_buckets_file = self.log_path / "summary_buckets.jsonl"
+        self.index_file = self.log_path / "index.jsonl"
+
+        # Kept open for the logger's lifetime; the writer thread appends
+        # each batch of entries with one writev per file
+        self._trades_fd = os.open(self.trades_file, _OPEN_FLAGS, 0o644)
+        self._executions_fd = os.open(self.executions_file, _OPEN_FLAGS, 0o644)
+        self._errors_fd = os.open(self.errors_file, _OPEN_FLAGS, 0o644)
+        self._fd_paths = {self._trades_fd: self.trades_file,
+                          self._executions_fd: self.executions_file,
+                          self._errors_fd: self.errors_file}
+
+        # Full log files are renamed to <name>.<start>-<end> segments, listed
+        # with their time range in index.jsonl so windowed summaries can skip them.
+        # Worker processes share these files and cannot coordinate a rename, so
+        # rotation is off when there is more than one
+        self._rotate_bytes = settings.TRADE_LOG_ROTATE_BYTES if settings.API_WORKERS <= 1 else 0
+        self._log_sizes = {fd: os.fstat(fd).st_size for fd in self._fd_paths}
+        # [first, last] entry time per file, None while earlier content is unscanned
+        self._log_ranges: Dict[int, Optional[list]] = {
+            fd: [None, None] if size == 0 else None for fd, size in self._log_sizes.items()}
+        self._segments: Dict[str, List[tuple]] = {}
+        self._segments_lock = threading.Lock()
+        self._load_index()
+
+        # log_* calls queue entries for the writer thread and return; the queue
+        # is bounded so a stalled disk slows callers instead of growing memory
+        self._log_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=settings.TRADE_LOG_QUEUE_SIZE)
+        # Last entry time encoded by the writer thread; entries of one tick share the instance
+        self._last_time: Optional[datetime] = None
+        self._last_time_encoded = b''
+        self._writer = threading.Thread(target=self._writer_loop, name="trade-log-writer", daemon=True)
+        self._writer.start()
+
+        # Per-minute summary counters, so summaries need not re-read the logs
+        self._use_buckets = settings.TRADE_SUMMARY_BUCKETS
+        self._buckets: Dict[datetime, Dict[str, Any]] = {}
+        self._buckets_lock = threading.Lock()
+        # Minutes whose counters changed since the last save
+        self._changed_minutes: set = set()
+        # Lines in the bucket file, None when it must be rewritten whole
+        self._bucket_lines: Optional[int] = None
+        self._buckets_save_lock = threading.Lock()
+        if self._use_buckets:
+            self._load_buckets()
 
     def log_order_created(self, order, current_time: datetime):
         """Log order creation"""
-        log_entry = {
-            "timestamp": current_time.isoformat(),
-            "type": "order_created",
-            "order_id": order.id,
-            "symbol": order.symbol,
-            "side": order.side.value if hasattr(order.side, 'value') else str(order.side),
-            "quantity": order.quantity,
-            "price": order.price,
-            "order_type": order.order_type.value if hasattr(order.order_type, 'value') else str(order.order_type),
-            "take_profit": order.take_profit_price,
-            "stop_loss": order.stop_loss_price
-        }
-
-        self._write_log(self.trades_file, log_entry)
-        logger.info(f"Order created: {order.id} - {order.symbol} {order.side} {order.quantity}")
+        self._write_record(self._trades_fd, _render_order_created, (
+            current_time,
+            order.id,
+            order.symbol,
+            order.side,
+            order.quantity,
+            order.price,
+            order.order_type,
+            order.take_profit_price,
+            order.stop_loss_price
+        ))
+        self._count(current_time, (("total_orders", 1),))
+        logger.info("Order created: %s - %s %s %s", order.id, order.symbol, order.side, order.quantity)
 
     def log_order_executed(self, order, execution_price: float, execution_time: datetime):
         """Log order execution"""
-        log_entry = {
-            "timestamp": execution_time.isoformat(),
-            "type": "order_executed",
-            "order_id": order.id,
-            "symbol": order.symbol,
-            "side": order.side.value if hasattr(order.side, 'value') else str(order.side),
-            "quantity": order.executed_quantity,
-            "execution_price": execution_price,
-            "commission": order.commission,
-            "slippage": abs(execution_price - order.price) if order.price > 0 else 0
-        }
-
-        self._write_log(self.executions_file, log_entry)
-        logger.info(f"Order executed: {order.id} - {order.symbol} {order.side} "
-                   f"{order.executed_quantity} @ {execution_price}")
+        self._write_record(self._executions_fd, _render_order_executed, (
+            execution_time,
+            order.id,
+            order.symbol,
+            order.side,
+            order.executed_quantity,
+            execution_price,
+            order.commission,
+            abs(execution_price - order.price) if order.price > 0 else 0
+        ))
+        self._count(execution_time, (("total_executions", 1),
+                                     ("total_volume", order.executed_quantity * execution_price),
+                                     ("total_commission", order.commission)))
+        logger.info("Order executed: %s - %s %s %s @ %s", order.id, order.symbol, order.side,
+                    order.executed_quantity, execution_price)
 
     def log_position_opened(self, position, current_time: datetime):
         """Log position opening"""
-        log_entry = {
-            "timestamp": current_time.isoformat(),
-            "type": "position_opened",
-            "symbol": position.symbol,
-            "side": position.side.value if hasattr(position.side, 'value') else str(position.side),
-            "quantity": position.quantity,
-            "entry_price": position.entry_price,
-            "leverage": position.leverage,
-            "margin": position.margin
-        }
-
-        self._write_log(self.trades_file, log_entry)
-        logger.info(f"Position opened: {position.symbol} {position.side} "
-                   f"{position.quantity} @ {position.entry_price}")
+        self._write_record(self._trades_fd, _render_position_opened, (
+            current_time,
+            position.symbol,
+            position.side,
+            position.quantity,
+            position.entry_price,
+            position.leverage,
+            position.margin
+        ))
+        self._count(current_time, (("total_positions_opened", 1),))
+        logger.info("Position opened: %s %s %s @ %s", position.symbol, position.side,
+                    position.quantity, position.entry_price)
 
     def log_position_closed(self, position, close_price: float, pnl: float, current_time: datetime):
         """Log position closing"""
@@ -90,7 +259,7 @@ class TradeLogger:
             "timestamp": current_time.isoformat(),
             "type": "position_closed",
             "symbol": position.symbol,
-            "side": position.side.value if hasattr(position.side, 'value') else str(position.side),
+            "side": position.side,
             "quantity": position.quantity,
             "entry_price": position.entry_price,
             "close_price": close_price,
@@ -98,9 +267,10 @@ class TradeLogger:
             "leverage": position.leverage
         }
 
-        self._write_log(self.trades_file, log_entry)
-        logger.info(f"Position closed: {position.symbol} {position.side} "
-                   f"{position.quantity} @ {close_price}, PnL: {pnl:.2f}")
+        self._write_log(self._trades_fd, log_entry)
+        self._count(current_time, (("total_positions_closed", 1), ("total_pnl", pnl)))
+        logger.info("Position closed: %s %s %s @ %s, PnL: %.2f", position.symbol, position.side,
+                    position.quantity, close_price, pnl)
 
     def log_tp_sl_triggered(self, position, trigger_type: str, trigger_price: float, current_time: datetime):
         """Log TP/SL trigger"""
@@ -108,29 +278,31 @@ class TradeLogger:
             "timestamp": current_time.isoformat(),
             "type": f"{trigger_type}_triggered",
             "symbol": position.symbol,
-            "side": position.side.value if hasattr(position.side, 'value') else str(position.side),
+            "side": position.side,
             "quantity": position.quantity,
             "entry_price": position.entry_price,
             "trigger_price": trigger_price,
             "trigger_type": trigger_type
         }
 
-        self._write_log(self.trades_file, log_entry)
-        logger.info(f"{trigger_type.upper()} triggered: {position.symbol} {position.side} "
-                   f"@ {trigger_price}")
+        self._write_log(self._trades_fd, log_entry)
+        logger.info("%s triggered: %s %s @ %s", trigger_type.upper(), position.symbol, position.side,
+                    trigger_price)
 
     def log_error(self, error_type: str, error_msg: str, context: Dict[str, Any] = None):
         """Log trading errors"""
+        now = datetime.now()
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "type": "error",
             "error_type": error_type,
             "error_msg": error_msg,
             "context": context or {}
         }
 
-        self._write_log(self.errors_file, log_entry)
-        logger.error(f"Trading error ({error_type}): {error_msg}")
+        self._write_log(self._errors_fd, log_entry)
+        self._count(now, (("errors", 1),))
+        logger.error("Trading error (%s): %s", error_type, error_msg)
 
     def log_balance_update(self, asset: str, old_balance: float, new_balance: float,
                           change_reason: str, current_time: datetime):
@@ -145,96 +317,335 @@ class TradeLogger:
             "change_reason": change_reason
         }
 
-        self._write_log(self.trades_file, log_entry)
-        logger.info(f"Balance updated: {asset} {old_balance:.2f} -> {new_balance:.2f} "
-                   f"({change_reason})")
-
-    def _write_log(self, file_path: Path, log_entry: Dict[str, Any]):
-        """Write log entry to file"""
-        try:
-            with open(file_path, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
-        except Exception as e:
-            logger.error(f"Error writing to log file {file_path}: {e}")
-
-    def get_trade_summary(self, start_time: datetime = None, end_time: datetime = None) -> Dict[str, Any]:
-        """Get trading summary from logs"""
+        self._write_log(self._trades_fd, log_entry)
+        logger.info("Balance updated: %s %.2f -> %.2f (%s)", asset, old_balance, new_balance,
+                    change_reason)
+
+    def _count(self, timestamp: datetime, increments: tuple):
+        """Add (counter, amount) increments to the summary bucket of the entry's minute"""
+        if not self._use_buckets:
+            return
+        minute = timestamp.replace(second=0, microsecond=0)
+        with self._buckets_lock:
+            bucket = self._buckets.get(minute)
+            if bucket is None:
+                bucket = self._buckets[minute] = _empty_summary()
+            for key, amount in increments:
+                bucket[key] += amount
+            self._changed_minutes.add(minute)
+
+    def _load_buckets(self):
+        """Load summary buckets, rebuilding them from the raw logs when the file is missing or stale"""
         try:
-            summary = {
-                "total_orders": 0,
-                "total_executions": 0,
-                "total_positions_opened": 0,
-                "total_positions_closed": 0,
-                "total_volume": 0.0,
-                "total_commission": 0.0,
-                "total_pnl": 0.0,
-                "errors": 0
-            }
-
-            # Read trades log
-            if self.trades_file.exists():
-                with open(self.trades_file, 'r') as f:
+            buckets_mtime = os.stat(self.summary_buckets_file).st_mtime_ns
+            # Entries logged after the last save (a crash, or a run with buckets
+            # turned off) are only in the raw logs
+            if all(os.fstat(fd).st_mtime_ns < buckets_mtime for fd in self._fd_paths):
+                lines = 0
+                with open(self.summary_buckets_file, 'rb') as f:
                     for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            entry_time = datetime.fromisoformat(entry['timestamp'])
-
-                            if start_time and entry_time < start_time:
-                                continue
-                            if end_time and entry_time > end_time:
-                                continue
+                        bucket = orjson.loads(line)
+                        # Later lines of a minute supersede earlier ones
+                        self._buckets[datetime.fromisoformat(bucket.pop("minute"))] = bucket
+                        lines += 1
+                self._bucket_lines = lines
+                return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Error loading summary buckets: %s", e)
 
-                            if entry['type'] == 'order_created':
-                                summary['total_orders'] += 1
-                            elif entry['type'] == 'position_opened':
-                                summary['total_positions_opened'] += 1
-                            elif entry['type'] == 'position_closed':
-                                summary['total_positions_closed'] += 1
-                                summary['total_pnl'] += entry.get('pnl', 0)
+        self._buckets.clear()
+        for timestamp, increments in self._iter_log_counts():
+            self._count(datetime.fromisoformat(timestamp), increments)
 
-                        except Exception as e:
-                            logger.error(f"Error parsing trade log entry: {e}")
+    def _save_buckets(self, touch: bool = False):
+        """
+        Append changed summary buckets to their file
 
-            # Read executions log
-            if self.executions_file.exists():
-                with open(self.executions_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            entry_time = datetime.fromisoformat(entry['timestamp'])
+        The file is rewritten whole once superseded lines outnumber current
+        ones. With touch, an unchanged file still gets a new mtime, marking it
+        current with the logs.
+        """
+        with self._buckets_save_lock:
+            with self._buckets_lock:
+                if not self._changed_minutes and not (touch and self._bucket_lines is not None):
+                    return
+                changed, self._changed_minutes = self._changed_minutes, set()
+                rewrite = (self._bucket_lines is None
+                           or self._bucket_lines + len(changed) > 2 * len(self._buckets))
+                data = b''.join(_dumps({"minute": minute, **self._buckets[minute]}, option=_DUMPS_OPTIONS)
+                                for minute in (self._buckets if rewrite else changed))
+                lines = len(self._buckets) if rewrite else self._bucket_lines + len(changed)
+            try:
+                if rewrite:
+                    tmp_path = self.summary_buckets_file.with_suffix('.tmp')
+                    with open(tmp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp_path, self.summary_buckets_file)
+                elif data:
+                    with open(self.summary_buckets_file, 'ab') as f:
+                        f.write(data)
+                else:
+                    os.utime(self.summary_buckets_file)
+                self._bucket_lines = lines
+            except Exception as e:
+                # An append may have been cut short, so start over with a full rewrite
+                with self._buckets_lock:
+                    self._changed_minutes |= changed
+                self._bucket_lines = None
+                logger.error("Error saving summary buckets: %s", e)
+
+    def _write_log(self, fd: int, log_entry: Dict[str, Any]):
+        """Queue log entry for the writer thread"""
+        self._log_queue.put((fd, _dumps_entry, log_entry))
+
+    def _write_record(self, fd: int, render: Callable[[bytes, tuple], bytes], values: tuple):
+        """Queue fixed-schema entry values for the writer thread to render"""
+        self._log_queue.put((fd, render, values))
+
+    def _writer_loop(self):
+        """Write queued entries, one writev per file for whatever piled up"""
+        while True:
+            batch = [self._log_queue.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pieces: Dict[int, list] = {}
+            times: Dict[int, list] = {}
+            for item in batch:
+                if item is None:
+                    continue
+                fd, render, data = item
+                try:
+                    if render is _dumps_entry:
+                        piece = render(data)
+                    else:
+                        piece = render(self._encode_time(data[0]), data)
+                    pieces.setdefault(fd, []).append(piece)
+                except Exception as e:
+                    logger.error("Error writing to log file %s: %s", self._fd_paths[fd], e)
+                    continue
+                if self._rotate_bytes:
+                    # Free-form entries carry their timestamp as an ISO string
+                    times.setdefault(fd, []).append(
+                        datetime.fromisoformat(data['timestamp']) if render is _dumps_entry else data[0])
+
+            for fd, entries in pieces.items():
+                try:
+                    _write_pieces(fd, entries)
+                except Exception as e:
+                    logger.error("Error writing to log file %s: %s", self._fd_paths[fd], e)
+                    continue
+                if self._rotate_bytes:
+                    self._track_written(fd, entries, times[fd])
+
+            for _ in batch:
+                self._log_queue.task_done()
+            # close() queues None last
+            if None in batch:
+                return
+
+    def _encode_time(self, value: datetime) -> bytes:
+        """JSON string of an entry time, reusing the last encoding for the same instance"""
+        if value is not self._last_time:
+            self._last_time = value
+            self._last_time_encoded = _dumps(value.isoformat())
+        return self._last_time_encoded
+
+    def _track_written(self, fd: int, entries: list, entry_times: list):
+        """Account for entries written to a log file and rotate it once it is full"""
+        self._log_sizes[fd] += sum(map(len, entries))
+        time_range = self._log_ranges[fd]
+        if time_range is not None:
+            first, last = min(entry_times), max(entry_times)
+            if time_range[0] is None or first < time_range[0]:
+                time_range[0] = first
+            if time_range[1] is None or last > time_range[1]:
+                time_range[1] = last
+        if self._log_sizes[fd] >= self._rotate_bytes:
+            try:
+                self._rotate(fd)
+            except Exception as e:
+                logger.error("Error rotating log file %s: %s", self._fd_paths[fd], e)
+
+    def _rotate(self, fd: int):
+        """Move a full log file aside as a segment and continue in a new file on the same descriptor"""
+        file_path = self._fd_paths[fd]
+        start, end = self._log_ranges[fd] or self._scan_time_range(file_path)
+        segment = file_path.with_name(f"{file_path.name}.{_segment_stamp(start)}-{_segment_stamp(end)}")
+        suffix = 1
+        while segment.exists():
+            segment = segment.with_name(f"{segment.name.rsplit('~', 1)[0]}~{suffix}")
+            suffix += 1
+
+        with self._segments_lock:
+            os.rename(file_path, segment)
+            # Queued entries keep their descriptor number, so the new file takes it over
+            new_fd = os.open(file_path, _OPEN_FLAGS, 0o644)
+            try:
+                os.dup2(new_fd, fd)
+            finally:
+                os.close(new_fd)
+            self._segments.setdefault(file_path.name, []).append((start, end, segment))
+            with open(self.index_file, 'ab') as f:
+                f.write(_dumps({"file": file_path.name, "segment": segment.name,
+                                "start": start, "end": end}, option=_DUMPS_OPTIONS))
+
+        self._log_sizes[fd] = 0
+        self._log_ranges[fd] = [None, None]
+        logger.info("Rotated %s to %s", file_path.name, segment.name)
+
+    def _scan_time_range(self, file_path: Path) -> list:
+        """[first, last] entry time of a log file written before this logger started"""
+        first = last = None
+        with open(file_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry_time = datetime.fromisoformat(orjson.loads(line)['timestamp'])
+                except Exception:
+                    continue
+                if first is None or entry_time < first:
+                    first = entry_time
+                if last is None or entry_time > last:
+                    last = entry_time
+        return [first, last]
+
+    def _load_index(self):
+        """Load the segment index, skipping segments that were removed"""
+        try:
+            with open(self.index_file, 'rb') as f:
+                for line in f:
+                    segment = orjson.loads(line)
+                    path = self.log_path / segment["segment"]
+                    if path.exists():
+                        self._segments.setdefault(segment["file"], []).append(
+                            (_parse_time(segment["start"]), _parse_time(segment["end"]), path))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Error loading log segment index: %s", e)
+
+    def _open_log_files(self, file_path: Path, start_time: datetime = None,
+                        end_time: datetime = None) -> list:
+        """Open a log's segments that may hold entries within the window, then its current file"""
+        with self._segments_lock:
+            paths = [path for start, end, path in self._segments.get(file_path.name, ())
+                     if not (start_time and end and end < start_time)
+                     and not (end_time and start and start > end_time)]
+            paths.append(file_path)
+            # Opened under the lock so a rotation cannot move a file in between
+            files = []
+            for path in paths:
+                try:
+                    files.append(open(path, 'rb'))
+                except FileNotFoundError:
+                    continue
+        return files
+
+    def flush(self):
+        """Wait until queued entries are written to the log files"""
+        if self._writer.is_alive():
+            self._log_queue.join()
+        if self._use_buckets:
+            self._save_buckets()
+
+    def close(self):
+        """Write queued entries, stop the writer thread and close the log files"""
+        if self._writer.is_alive():
+            self._log_queue.put(None)
+            self._writer.join()
+        if self._use_buckets:
+            # Mark the file current even if only uncounted entries (TP/SL, balance) came since the last save
+            self._save_buckets(touch=True)
+        # Unlike file objects, descriptors must not be closed twice
+        while self._fd_paths:
+            fd, file_path = self._fd_paths.popitem()
+            try:
+                os.close(fd)
+            except Exception as e:
+                logger.error("Error closing log file %s: %s", file_path, e)
 
-                            if start_time and entry_time < start_time:
-                                continue
-                            if end_time and entry_time > end_time:
-                                continue
+    def get_trade_summary(self, start_time: datetime = None, end_time: datetime = None) -> Dict[str, Any]:
+        """
+        Get trading summary from logs
 
-                            summary['total_executions'] += 1
-                            summary['total_volume'] += entry.get('quantity', 0) * entry.get('execution_price', 0)
-                            summary['total_commission'] += entry.get('commission', 0)
+        With settings.TRADE_SUMMARY_BUCKETS the summary comes from per-minute
+        counters, so start_time is rounded down to its minute.
+        """
+        try:
+            # Entries still queued would be missed by the readers below
+            self.flush()
+
+            summary = _empty_summary()
+
+            if self._use_buckets:
+                start_minute = start_time.replace(second=0, microsecond=0) if start_time else None
+                with self._buckets_lock:
+                    for minute, bucket in self._buckets.items():
+                        if start_minute and minute < start_minute:
+                            continue
+                        if end_time and minute > end_time:
+                            continue
+                        for key, amount in bucket.items():
+                            summary[key] += amount
+                return summary
+
+            # Running totals keep memory flat however long the logs grow
+            for _, increments in self._iter_log_counts(start_time, end_time):
+                for key, amount in increments:
+                    summary[key] += amount
 
-                        except Exception as e:
-                            logger.error(f"Error parsing execution log entry: {e}")
+            return summary
 
-            # Read errors log
-            if self.errors_file.exists():
-                with open(self.errors_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
+        except Exception as e:
+            logger.error("Error generating trade summary: %s", e)
+            return {}
+
+    def _iter_log_entries(self, file_path: Path, kind: str,
+                          start_time: datetime = None, end_time: datetime = None):
+        """Yield entries of a log and its segments, parsing timestamps only when there is a window to check"""
+        windowed = start_time is not None or end_time is not None
+        for f in self._open_log_files(file_path, start_time, end_time):
+            with f:
+                for line in f:
+                    try:
+                        entry = orjson.loads(line)
+                        if windowed:
                             entry_time = datetime.fromisoformat(entry['timestamp'])
-
                             if start_time and entry_time < start_time:
                                 continue
                             if end_time and entry_time > end_time:
                                 continue
-
-                            summary['errors'] += 1
-
-                        except Exception as e:
-                            logger.error(f"Error parsing error log entry: {e}")
-
-            return summary
-
-        except Exception as e:
-            logger.error(f"Error generating trade summary: {e}")
-            return {}
\ No newline at end of file
+                    except Exception as e:
+                        logger.error("Error parsing %s log entry: %s", kind, e)
+                        continue
+                    yield entry
+
+    def _iter_log_counts(self, start_time: datetime = None, end_time: datetime = None):
+        """Yield (ISO timestamp, counter increments) for the log entries within the window"""
+        for file_path, kind, counts in ((self.trades_file, "trade", _trade_counts),
+                                        (self.executions_file, "execution", _execution_counts),
+                                        (self.errors_file, "error", _error_counts)):
+            for entry in self._iter_log_entries(file_path, kind, start_time, end_time):
+                try:
+                    timestamp = entry['timestamp']
+                    increments = counts(entry)
+                except Exception as e:
+                    logger.error("Error parsing %s log entry: %s", kind, e)
+                    continue
+                if increments:
+                    yield timestamp, increments
+
+# Global trade logger, created on first use
+_trade_logger: Optional[TradeLogger] = None
+
+def get_trade_logger() -> TradeLogger:
+    """Get the global TradeLogger, creating it on first call"""
+    global _trade_logger
+    if _trade_logger is None:
+        _trade_logger = TradeLogger()
+    return _trade_logger
@@ -3,15 +3,27 @@ Test script for BingX Emulator API
 """
 import requests
 import json
+import os
 import time
 
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive connection pool for every call instead of a new connection each time
+session = requests.Session()
+session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Payloads are pretty-printed only with DEBUG set; indenting them costs more than the calls
+DEBUG = bool(os.environ.get("DEBUG"))
+
+def fmt(data):
+    """Payload for printing, indented JSON in DEBUG mode"""
+    return json.dumps(data, indent=2) if DEBUG else data
+
 def test_klines():
     """Test klines endpoint"""
     print("Testing klines endpoint...")
 
-    response = requests.get(f"{BASE_URL}/openApi/swap/v3/quote/klines", params={
+    response = session.get(f"{BASE_URL}/openApi/swap/v3/quote/klines", params={
         "symbol": "ADA-USDT",
         "interval": "5m",
         "limit": 10
@@ -31,7 +43,7 @@ def test_depth():
     """Test depth endpoint"""
     print("\nTesting depth endpoint...")
 
-    response = requests.get(f"{BASE_URL}/openApi/swap/v2/quote/depth", params={
+    response = session.get(f"{BASE_URL}/openApi/swap/v2/quote/depth", params={
         "symbol": "ADA-USDT",
         "limit": 10
     })
@@ -39,17 +51,17 @@ def test_depth():
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Code: {data.get('code')}")
-    print(f"Data: {json.dumps(data.get('data'), indent=2)}")
+    print(f"Data: {fmt(data.get('data'))}")
 
 def test_health():
     """Test health endpoint"""
     print("\nTesting health endpoint...")
 
-    response = requests.get(f"{BASE_URL}/health")
+    response = session.get(f"{BASE_URL}/health")
 
     print(f"Status: {response.status_code}")
     data = response.json()
-    print(f"Health data: {json.dumps(data, indent=2)}")
+    print(f"Health data: {fmt(data)}")
 
 def test_order():
     """Test order creation"""
@@ -65,42 +77,42 @@ def test_order():
         "stopLoss": '{"type": "STOP_MARKET", "stopPrice": 0.4, "price": 0.4, "workingType": "MARK_PRICE"}'
     }
 
-    response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+    response = session.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
 
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Code: {data.get('code')}")
     print(f"Message: {data.get('msg')}")
-    print(f"Order data: {json.dumps(data.get('data'), indent=2)}")
+    print(f"Order data: {fmt(data.get('data'))}")
 
 def test_positions():
     """Test positions endpoint"""
     print("\nTesting positions endpoint...")
 
-    response = requests.get(f"{BASE_URL}/openApi/swap/v2/user/positions")
+    response = session.get(f"{BASE_URL}/openApi/swap/v2/user/positions")
 
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Code: {data.get('code')}")
-    print(f"Positions: {json.dumps(data.get('data'), indent=2)}")
+    print(f"Positions: {fmt(data.get('data'))}")
 
 def test_trading_summary():
     """Test trading summary endpoint"""
     print("\nTesting trading summary endpoint...")
 
-    response = requests.get(f"{BASE_URL}/api/v1/trading/summary")
+    response = session.get(f"{BASE_URL}/api/v1/trading/summary")
 
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Code: {data.get('code')}")
-    print(f"Trading Summary: {json.dumps(data.get('data'), indent=2)}")
+    print(f"Trading Summary: {fmt(data.get('data'))}")
 
 def test_state_management():
     """Test state management endpoints"""
     print("\nTesting state management...")
 
     # Save state
-    response = requests.post(f"{BASE_URL}/api/v1/state/save")
+    response = session.post(f"{BASE_URL}/api/v1/state/save")
     print(f"Save state - Status: {response.status_code}")
     data = response.json()
     print(f"Save state - Code: {data.get('code')}")
@@ -111,7 +123,7 @@ def test_order_management():
     print("\nTesting order management...")
 
     # Get all orders
-    response = requests.get(f"{BASE_URL}/openApi/swap/v2/trade/allOrders", params={"limit": 10})
+    response = session.get(f"{BASE_URL}/openApi/swap/v2/trade/allOrders", params={"limit": 10})
     print(f"All orders - Status: {response.status_code}")
     data = response.json()
     print(f"All orders - Code: {data.get('code')}")
@@ -122,14 +134,14 @@ def test_time_management():
     print("\nTesting time management...")
 
     # Get current time
-    response = requests.get(f"{BASE_URL}/api/v1/time/current")
+    response = session.get(f"{BASE_URL}/api/v1/time/current")
     print(f"Current time - Status: {response.status_code}")
     data = response.json()
     print(f"Current time - Code: {data.get('code')}")
     print(f"Current time: {data.get('data', {}).get('current_time')}")
 
     # Advance time
-    response = requests.post(f"{BASE_URL}/api/v1/time/advance", json={"steps": 5})
+    response = session.post(f"{BASE_URL}/api/v1/time/advance", json={"steps": 5})
     print(f"Advance time - Status: {response.status_code}")
     data = response.json()
     print(f"Advance time - Code: {data.get('code')}")
@@ -140,7 +152,7 @@ def test_config_management():
     print("\nTesting configuration management...")
 
     # Get config
-    response = requests.get(f"{BASE_URL}/api/v1/config")
+    response = session.get(f"{BASE_URL}/api/v1/config")
     print(f"Get config - Status: {response.status_code}")
     data = response.json()
     print(f"Get config - Code: {data.get('code')}")
@@ -2,10 +2,14 @@
 Test script for immediate order execution with TP/SL simulation
 """
 import requests
-import json
+import orjson
 
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive connection pool for every call instead of a new connection each time
+session = requests.Session()
+session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 def test_immediate_execution_no_tp_sl():
     """Test immediate execution without TP/SL"""
     print("Testing immediate execution without TP/SL...")
@@ -20,11 +24,11 @@ def test_immediate_execution_no_tp_sl():
     }
 
     try:
-        response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+        response = session.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Code: {data.get('code')}")
 
             order = data.get('data', {}).get('order', {})
@@ -63,11 +67,11 @@ def test_immediate_execution_with_tp():
     }
 
     try:
-        response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+        response = session.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Code: {data.get('code')}")
 
             order = data.get('data', {}).get('order', {})
@@ -106,11 +110,11 @@ def test_immediate_execution_with_sl():
     }
 
     try:
-        response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+        response = session.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Code: {data.get('code')}")
 
             order = data.get('data', {}).get('order', {})
@@ -150,11 +154,11 @@ def test_immediate_execution_with_tp_sl():
     }
 
     try:
-        response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+        response = session.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Code: {data.get('code')}")
 
             order = data.get('data', {}).get('order', {})
@@ -195,11 +199,11 @@ def test_short_position_immediate():
     }
 
     try:
-        response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+        response = session.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Code: {data.get('code')}")
 
             order = data.get('data', {}).get('order', {})
@@ -228,11 +232,11 @@ def test_positions_after_immediate():
     print("\nTesting positions after immediate execution...")
 
     try:
-        response = requests.get(f"{BASE_URL}/openApi/swap/v2/user/positions")
+        response = session.get(f"{BASE_URL}/openApi/swap/v2/user/positions")
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             positions = data.get('data', [])
             print(f"Positions count: {len(positions)}")
 
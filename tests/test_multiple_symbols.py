@@ -3,18 +3,41 @@ Test script for multiple symbols trading
 """
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive connection pool for every call instead of a new connection each time
+session = requests.Session()
+session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+def _call(request):
+    """Run a request, returning the exception instead of raising it"""
+    try:
+        return request()
+    except Exception as e:
+        return e
+
+def fetch_all(requests_to_send):
+    """Send independent requests concurrently, results in the same order"""
+    with ThreadPoolExecutor(max_workers=len(requests_to_send)) as pool:
+        return list(pool.map(_call, requests_to_send))
+
 def test_multiple_symbols_klines():
     """Test klines for multiple symbols"""
     print("Testing klines for multiple symbols...")
 
     symbols = ["ADA-USDT", "BTC-USDT", "BNB-USDT", "AVAX-USDT", "ATOM-USDT"]
+    responses = fetch_all([
+        partial(session.get, f"{BASE_URL}/openApi/swap/v3/quote/klines?symbol={symbol}&limit=3")
+        for symbol in symbols
+    ])
 
-    for symbol in symbols:
+    for symbol, response in zip(symbols, responses):
         try:
-            response = requests.get(f"{BASE_URL}/openApi/swap/v3/quote/klines?symbol={symbol}&limit=3")
+            if isinstance(response, Exception):
+                raise response
             print(f"\n{symbol}:")
             print(f"  Status: {response.status_code}")
 
@@ -37,10 +60,15 @@ def test_multiple_symbols_depth():
     print("\nTesting depth for multiple symbols...")
 
     symbols = ["ADA-USDT", "BTC-USDT", "BNB-USDT"]
+    responses = fetch_all([
+        partial(session.get, f"{BASE_URL}/openApi/swap/v2/quote/depth?symbol={symbol}&limit=3")
+        for symbol in symbols
+    ])
 
-    for symbol in symbols:
+    for symbol, response in zip(symbols, responses):
         try:
-            response = requests.get(f"{BASE_URL}/openApi/swap/v2/quote/depth?symbol={symbol}&limit=3")
+            if isinstance(response, Exception):
+                raise response
             print(f"\n{symbol}:")
             print(f"  Status: {response.status_code}")
 
@@ -62,18 +90,22 @@ def test_trading_multiple_symbols():
 
     symbols = ["ADA-USDT", "BTC-USDT", "BNB-USDT"]
 
-    for symbol in symbols:
+    # Create a small order per symbol; orders on different symbols are independent
+    responses = fetch_all([
+        partial(session.post, f"{BASE_URL}/openApi/swap/v2/trade/order", json={
+            "symbol": symbol,
+            "side": "BUY",
+            "positionSide": "LONG",
+            "type": "MARKET",
+            "quantity": 10.0
+        })
+        for symbol in symbols
+    ])
+
+    for symbol, response in zip(symbols, responses):
         try:
-            # Create a small order
-            order_data = {
-                "symbol": symbol,
-                "side": "BUY",
-                "positionSide": "LONG",
-                "type": "MARKET",
-                "quantity": 10.0
-            }
-
-            response = requests.post(f"{BASE_URL}/openApi/swap/v2/trade/order", json=order_data)
+            if isinstance(response, Exception):
+                raise response
             print(f"\n{symbol} order:")
             print(f"  Status: {response.status_code}")
 
@@ -95,7 +127,7 @@ def test_positions_multiple_symbols():
     print("\nTesting positions...")
 
     try:
-        response = requests.get(f"{BASE_URL}/openApi/swap/v2/user/positions")
+        response = session.get(f"{BASE_URL}/openApi/swap/v2/user/positions")
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
@@ -0,0 +1,85 @@
+"""
+Test script for OrderEngine candle processing (runs in-process, no server needed)
+"""
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trading.balance_manager import BalanceManager
+from src.trading.order_engine import OrderEngine
+
+SYMBOL = "ADA-USDT"
+SEEDS = range(20)
+
+def random_level(rng, price, above):
+    """Optional TP/SL level a few percent above or below price"""
+    if rng.random() < 0.3:
+        return None
+    offset = rng.uniform(0.01, 0.06)
+    return price * (1 + offset) if above else price * (1 - offset)
+
+def create_pending_orders(engine, rng, price):
+    """Queue market orders that the next candle fills"""
+    for _ in range(rng.randint(0, 3)):
+        side = rng.choice(["BUY", "SELL"])
+        engine.create_order(
+            SYMBOL, side, rng.uniform(1, 5),
+            take_profit=random_level(rng, price, side == "BUY"),
+            stop_loss=random_level(rng, price, side != "BUY")
+        )
+
+def random_candles(rng, n, price):
+    """(opens, highs, lows, closes, volumes) of a random walk starting at price"""
+    closes = price * np.cumprod(1 + np.array([rng.gauss(0, 0.004) for _ in range(n)]))
+    opens = np.concatenate(([price], closes[:-1]))
+    highs = np.maximum(opens, closes) * (1 + np.array([rng.uniform(0, 0.003) for _ in range(n)]))
+    lows = np.minimum(opens, closes) * (1 - np.array([rng.uniform(0, 0.003) for _ in range(n)]))
+    return opens, highs, lows, closes, np.ones(n)
+
+def run_engine(seed, batched):
+    """Replay one random scenario, with process_candles or one process_candle per candle"""
+    rng = random.Random(seed)
+    balance_manager = BalanceManager(100000.0)
+    engine = OrderEngine(balance_manager)
+    price = 1.0
+
+    for _ in range(4):
+        create_pending_orders(engine, rng, price)
+        opens, highs, lows, closes, volumes = random_candles(rng, rng.randint(20, 200), price)
+        if batched:
+            engine.process_candles(SYMBOL, opens, highs, lows, closes, volumes)
+        else:
+            for candle in zip(opens, highs, lows, closes, volumes):
+                engine.process_candle(SYMBOL, *map(float, candle))
+        price = float(closes[-1])
+
+    return balance_manager, engine
+
+def test_process_candles_matches_process_candle():
+    """process_candles leaves the same state as calling process_candle for each candle"""
+    for seed in SEEDS:
+        batched_balances, batched_engine = run_engine(seed, batched=True)
+        balances, engine = run_engine(seed, batched=False)
+
+        assert sorted(batched_balances.positions) == sorted(balances.positions), seed
+        for key, position in balances.positions.items():
+            assert batched_balances.positions[key].to_dict() == position.to_dict(), seed
+
+        assert len(batched_engine.order_history) == len(engine.order_history), seed
+        assert ([(o.side, o.status, o.executed_price) for o in batched_engine.order_history]
+                == [(o.side, o.status, o.executed_price) for o in engine.order_history]), seed
+        assert not batched_engine.orders and not engine.orders, seed
+        assert math.isclose(batched_balances.balances["USDT"].free, balances.balances["USDT"].free,
+                            rel_tol=0, abs_tol=1e-9), seed
+
+if __name__ == "__main__":
+    print("OrderEngine Candle Processing Test")
+    print("=" * 50)
+
+    test_process_candles_matches_process_candle()
+    print(f"process_candles matches process_candle on {len(SEEDS)} random runs")
@@ -0,0 +1,120 @@
+"""
+Test script for StateManager order history persistence (runs in-process, no server needed)
+"""
+import os
+import sys
+import tempfile
+
+import orjson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import settings
+from src.state.manager import StateManager
+from src.time.manager import TimeManager
+from src.trading.balance_manager import BalanceManager
+from src.trading.order_engine import OrderEngine
+
+SYMBOL = "ADA-USDT"
+
+def new_state(state_path):
+    """StateManager over state_path with a freshly loaded engine wired to it"""
+    state_manager = StateManager(state_path)
+    balance_manager = BalanceManager(100000.0)
+    engine = OrderEngine(balance_manager)
+    time_manager = TimeManager()
+    state_manager.load_all_state(balance_manager, engine, time_manager)
+    engine.on_change = state_manager.mark_dirty
+    return state_manager, balance_manager, engine, time_manager
+
+def fill_orders(engine, count):
+    """Fill count market orders, each landing in the order history"""
+    for i in range(count):
+        success, msg, order = engine.create_order(SYMBOL, "BUY" if i % 2 else "SELL", 1.0 + i)
+        assert success, msg
+        assert engine.execute_market_order(order, 1.0, 1.0, 1.0)
+
+def save(state_manager, balance_manager, engine, time_manager):
+    """Write the current state and wait for it"""
+    state_manager.save_all_state(balance_manager, engine, time_manager, wait=True)
+
+def history_file_ids(state_manager):
+    """Order IDs in the history file, in file order"""
+    with open(state_manager.order_history_file, 'rb') as f:
+        return [orjson.loads(line)['orderId'] for line in f]
+
+def test_history_appends_new_orders():
+    """Saves append only new orders, and a restart resumes appending"""
+    with tempfile.TemporaryDirectory() as state_path:
+        state = new_state(state_path)
+        fill_orders(state[2], 3)
+        save(*state)
+        fill_orders(state[2], 2)
+        save(*state)
+        assert history_file_ids(state[0]) == [order.id for order in state[2].order_history]
+
+        # Rewriting would replace the file; appending keeps its inode
+        inode = os.stat(state[0].order_history_file).st_ino
+        state = new_state(state_path)
+        assert len(state[2].order_history) == 5
+        fill_orders(state[2], 2)
+        save(*state)
+        assert os.stat(state[0].order_history_file).st_ino == inode
+        assert history_file_ids(state[0]) == [order.id for order in state[2].order_history]
+
+def test_history_rewritten_when_ring_buffer_drops_orders():
+    """Once saved orders fall out of the bounded history the file is rewritten to match"""
+    max_orders = settings.ORDER_HISTORY_MAX
+    settings.ORDER_HISTORY_MAX = 4
+    try:
+        with tempfile.TemporaryDirectory() as state_path:
+            state = new_state(state_path)
+            fill_orders(state[2], 3)
+            save(*state)
+            # The last saved order is still held, so these are appended
+            fill_orders(state[2], 1)
+            save(*state)
+            assert len(history_file_ids(state[0])) == 4
+            # Now it is dropped, so the file is rewritten from the buffer
+            fill_orders(state[2], 4)
+            save(*state)
+            assert history_file_ids(state[0]) == [order.id for order in state[2].order_history]
+
+            # A file longer than the buffer loads its newest orders and is rewritten
+            fill_orders(state[2], 2)
+            save(*state)
+            assert len(history_file_ids(state[0])) == 6
+            state = new_state(state_path)
+            assert [order.id for order in state[2].order_history] == history_file_ids(state[0])[-4:]
+            fill_orders(state[2], 1)
+            save(*state)
+            assert history_file_ids(state[0]) == [order.id for order in state[2].order_history]
+    finally:
+        settings.ORDER_HISTORY_MAX = max_orders
+
+def test_history_recovers_from_truncated_line():
+    """A partial last record is skipped on load and the next save rewrites the file"""
+    with tempfile.TemporaryDirectory() as state_path:
+        state = new_state(state_path)
+        fill_orders(state[2], 3)
+        save(*state)
+        saved_ids = history_file_ids(state[0])
+        with open(state[0].order_history_file, 'ab') as f:
+            f.write(b'{"orderId": "cut sho')
+
+        state = new_state(state_path)
+        assert [order.id for order in state[2].order_history] == saved_ids
+        fill_orders(state[2], 1)
+        save(*state)
+        assert history_file_ids(state[0]) == [order.id for order in state[2].order_history]
+
+if __name__ == "__main__":
+    print("StateManager Order History Test")
+    print("=" * 50)
+
+    test_history_appends_new_orders()
+    print("New orders are appended across saves and restarts")
+    test_history_rewritten_when_ring_buffer_drops_orders()
+    print("History file is rewritten after the ring buffer drops orders")
+    test_history_recovers_from_truncated_line()
+    print("Truncated history records are skipped and rewritten")
@@ -2,82 +2,148 @@
 Test script for multiple symbols support
 """
 import requests
-import json
+import orjson
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
-BASE_URL = "http://localhost:8000"
+# SIM_URL points the tests at another emulator, e.g. one on a Unix socket
+# (settings.API_UDS) as "http+unix://%2Ftmp%2Femulator.sock"
+BASE_URL = os.environ.get("SIM_URL", "http://localhost:8000")
+URL_SYMBOLS = f"{BASE_URL}/api/v1/symbols"
+URL_KLINES = f"{BASE_URL}/openApi/swap/v3/quote/klines"
+URL_KLINES_BATCH = f"{BASE_URL}/api/v1/klines/batch"
+URL_HEALTH = f"{BASE_URL}/health"
+
+class KeepAliveAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter whose sockets also enable TCP keepalive (urllib3 already sets TCP_NODELAY)"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+# One keep-alive connection pool for every call instead of a new connection each time
+session = requests.Session()
+session.headers.update({"Connection": "keep-alive"})
+if BASE_URL.startswith("http+unix://"):
+    # Optional dependency, only needed for Unix socket URLs
+    import requests_unixsocket
+    session.mount("http+unix://", requests_unixsocket.UnixAdapter())
+
+# Transient failures are retried with backoff; POST is only used for the read-only klines batch
+session.mount("http://", KeepAliveAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504],
+                      allowed_methods=["GET", "POST"])
+))
+
+# Symbols rarely change, so repeated runs may reuse the last response for
+# SYMBOLS_CACHE_TTL seconds; 0 (the default) always asks the server
+SYMBOLS_CACHE = Path(__file__).parent / ".cache" / "symbols.json"
+SYMBOLS_CACHE_TTL = float(os.environ.get("SYMBOLS_CACHE_TTL", "0"))
+
+def fetch_symbols():
+    """Get (status code, body) of the symbols endpoint, from the cache while it is fresh"""
+    if SYMBOLS_CACHE_TTL > 0:
+        try:
+            if time.time() - SYMBOLS_CACHE.stat().st_mtime < SYMBOLS_CACHE_TTL:
+                return 200, SYMBOLS_CACHE.read_bytes()
+        except FileNotFoundError:
+            pass
+
+    response = session.get(URL_SYMBOLS)
+    if response.status_code == 200 and SYMBOLS_CACHE_TTL > 0:
+        SYMBOLS_CACHE.parent.mkdir(exist_ok=True)
+        SYMBOLS_CACHE.write_bytes(response.content)
+    return response.status_code, response.content
+
+def emit(lines):
+    """Write a test's output lines with a single write"""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def test_available_symbols():
     """Test getting available symbols"""
-    print("Testing available symbols endpoint...")
+    out = ["Testing available symbols endpoint..."]
 
     try:
-        response = requests.get(f"{BASE_URL}/api/v1/symbols")
-        print(f"Status: {response.status_code}")
+        status_code, content = fetch_symbols()
+        out.append(f"Status: {status_code}")
 
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Code: {data.get('code')}")
-            symbols = data.get('data', {}).get('symbols', [])
-            count = data.get('data', {}).get('count', 0)
-            print(f"Available symbols ({count}): {symbols}")
+        if status_code == 200:
+            data = orjson.loads(content)
+            out.append(f"Code: {data.get('code')}")
+            payload = data.get('data') or {}
+            symbols = payload.get('symbols', [])
+            count = payload.get('count', 0)
+            out.append(f"Available symbols ({count}): {symbols}")
         else:
-            print(f"Error: {response.text}")
+            out.append(f"Error: {content.decode()}")
 
     except Exception as e:
-        print(f"Error: {e}")
+        out.append(f"Error: {e}")
+    finally:
+        emit(out)
 
 def test_symbol_validation():
     """Test symbol validation"""
-    print("\nTesting symbol validation...")
+    out = ["\nTesting symbol validation..."]
 
-    # Test existing symbol
+    # Both probes share one round trip through the batch endpoint
     try:
-        response = requests.get(f"{BASE_URL}/openApi/swap/v3/quote/klines?symbol=ADA-USDT&limit=5")
-        print(f"ADA-USDT klines - Status: {response.status_code}")
+        response = session.post(URL_KLINES_BATCH, json={"queries": [
+            {"symbol": "ADA-USDT", "limit": 5},
+            {"symbol": "BTC-USDT", "limit": 5}
+        ]})
+        out.append(f"Klines batch - Status: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
-            print(f"ADA-USDT klines - Code: {data.get('code')}")
-            print(f"ADA-USDT klines - Count: {len(data.get('data', []))}")
-    except Exception as e:
-        print(f"Error testing ADA-USDT: {e}")
-
-    # Test non-existing symbol
-    try:
-        response = requests.get(f"{BASE_URL}/openApi/swap/v3/quote/klines?symbol=BTC-USDT&limit=5")
-        print(f"BTC-USDT klines - Status: {response.status_code}")
-        if response.status_code == 404:
-            data = response.json()
-            print(f"BTC-USDT klines - Code: {data.get('code')}")
-            print(f"BTC-USDT klines - Message: {data.get('msg')}")
+            payload = orjson.loads(response.content).get('data') or {}
+            for result in payload.get('results', []):
+                symbol = result.get('symbol')
+                out.append(f"{symbol} klines - Code: {result.get('code')}")
+                if result.get('code') == 0:
+                    out.append(f"{symbol} klines - Count: {len(result.get('data', []))}")
+                else:
+                    out.append(f"{symbol} klines - Message: {result.get('msg')}")
     except Exception as e:
-        print(f"Error testing BTC-USDT: {e}")
+        out.append(f"Error testing klines batch: {e}")
+    finally:
+        emit(out)
 
 def test_health_with_symbols():
     """Test health endpoint"""
-    print("\nTesting health endpoint...")
+    out = ["\nTesting health endpoint..."]
 
     try:
-        response = requests.get(f"{BASE_URL}/health")
-        print(f"Status: {response.status_code}")
+        response = session.get(URL_HEALTH)
+        out.append(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
-            print(f"Health: {data.get('status')}")
-            print(f"Current time: {data.get('current_time')}")
-            print(f"Balance: {data.get('balance')}")
+            data = orjson.loads(response.content)
+            out.append(f"Health: {data.get('status')}")
+            out.append(f"Current time: {data.get('current_time')}")
+            out.append(f"Balance: {data.get('balance')}")
     except Exception as e:
-        print(f"Error: {e}")
+        out.append(f"Error: {e}")
+    finally:
+        emit(out)
 
 if __name__ == "__main__":
     print("Multiple Symbols Support Test")
     print("=" * 50)
 
     try:
-        test_available_symbols()
-        test_symbol_validation()
-        test_health_with_symbols()
+        with session:
+            test_available_symbols()
+            test_symbol_validation()
+            test_health_with_symbols()
 
     except requests.exceptions.ConnectionError:
-        print("Error: Could not connect to server. Make sure the emulator is running on http://localhost:8000")
+        print(f"Error: Could not connect to server. Make sure the emulator is running on {BASE_URL}")
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Parametrized klines checks for test_symbols, run with pytest
+"""
+import orjson
+import pytest
+import requests
+
+from tests.test_symbols import BASE_URL, URL_HEALTH, URL_KLINES, session
+
+@pytest.fixture(scope="session")
+def api_session():
+    """Pooled session shared by all parametrized cases, skipping them when no server runs"""
+    try:
+        session.get(URL_HEALTH, timeout=5)
+    except requests.exceptions.ConnectionError:
+        pytest.skip(f"emulator is not running on {BASE_URL}")
+    yield session
+    session.close()
+
+@pytest.mark.parametrize("symbol,expected_status", [
+    ("ADA-USDT", 200),
+    ("BTC-USDT", 404),
+])
+def test_klines_symbol(api_session, symbol, expected_status):
+    """Known symbols return klines, unknown ones a BingX-style 404"""
+    response = api_session.get(URL_KLINES, params={"symbol": symbol, "limit": 5})
+    assert response.status_code == expected_status
+
+    data = orjson.loads(response.content)
+    if expected_status == 200:
+        assert data.get('code') == 0
+        assert len(data.get('data', [])) == 5
+    else:
+        assert data.get('code') == 404